@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+准入控制模块 - 按端点限制排队深度，饱和时立即拒绝
+每个端点记录正在排队与执行的请求数，以及最近请求的服务时间（指数加权平均），
+据此估算新请求的排队等待时间；排队已满时抛出 Overloaded，
+由接口返回 429 并在 Retry-After 中给出按当前吞吐量估算的重试时间，而不是接收无法按时完成的请求
+"""
+
+import math
+import threading
+import time
+
+# 服务时间指数加权平均的平滑系数
+EWMA_ALPHA = 0.2
+
+# Retry-After 的上下限（秒）
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 300
+
+
+class Overloaded(Exception):
+    """端点排队已满"""
+
+    def __init__(self, endpoint, retry_after, detail):
+        super().__init__(detail)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """一次被准入的请求（完成时必须调用 done，可作为上下文管理器使用）"""
+
+    def __init__(self, gate):
+        self._gate = gate
+        self._started_at = None
+        self._done = False
+
+    def start(self):
+        """标记开始执行（此前为排队时间）"""
+        if self._started_at is None:
+            self._started_at = time.time()
+            self._gate._on_start()
+
+    def run(self, fn, *args, **kwargs):
+        """标记开始执行并调用 fn（用于把排队结束的时刻放在通道线程池中）"""
+        self.start()
+        return fn(*args, **kwargs)
+
+    def done(self):
+        """请求结束，释放排队名额（可重复调用）"""
+        if self._done:
+            return
+        self._done = True
+        self._gate._on_done(self._started_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.done()
+        return False
+
+
+class EndpointGate:
+    """单个端点的排队计数与吞吐量估计"""
+
+    def __init__(self, name, limit, concurrency):
+        """
+        Args:
+            name: 端点名称
+            limit: 排队与执行中的请求总数上限（0 表示不限制）
+            concurrency: 该端点同时执行的请求数（用于由服务时间换算吞吐量）
+        """
+        self.name = name
+        self.limit = max(0, int(limit))
+        self.concurrency = max(1, int(concurrency))
+
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.running = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.service_time = None
+
+    def admit(self):
+        """
+        申请准入
+
+        Returns:
+            Ticket
+
+        Raises:
+            Overloaded: 排队已满
+        """
+        with self._lock:
+            if self.limit and self.in_flight >= self.limit:
+                self.rejected += 1
+                retry_after = self._retry_after()
+                raise Overloaded(
+                    self.name,
+                    retry_after,
+                    f"{self.name} 排队已满（{self.in_flight}/{self.limit}），请 {retry_after} 秒后重试"
+                )
+            self.in_flight += 1
+            self.admitted += 1
+        return Ticket(self)
+
+    def _throughput(self):
+        """当前吞吐量估计（请求/秒），尚无样本时返回 None（调用方需持有锁）"""
+        if not self.service_time:
+            return None
+        return self.concurrency / self.service_time
+
+    def _estimated_wait(self):
+        """新请求的预计排队时间（秒，调用方需持有锁）"""
+        throughput = self._throughput()
+        ahead = self.in_flight - self.running
+        if throughput is None or self.in_flight < self.concurrency or ahead <= 0:
+            return 0.0
+        return ahead / throughput
+
+    def _retry_after(self):
+        """排队降到上限以下所需的时间（秒，调用方需持有锁）"""
+        throughput = self._throughput()
+        if throughput is None:
+            return MIN_RETRY_AFTER
+        excess = self.in_flight - self.limit + 1
+        return min(MAX_RETRY_AFTER, max(MIN_RETRY_AFTER, math.ceil(excess / throughput)))
+
+    def _on_start(self):
+        with self._lock:
+            self.running += 1
+
+    def _on_done(self, started_at):
+        with self._lock:
+            self.in_flight -= 1
+            if started_at is None:
+                # 排队中被取消的请求不计入服务时间
+                return
+            self.running -= 1
+            self.completed += 1
+            elapsed = time.time() - started_at
+            self.service_time = elapsed if self.service_time is None else (
+                EWMA_ALPHA * elapsed + (1 - EWMA_ALPHA) * self.service_time
+            )
+
+    def stats(self):
+        """返回该端点的排队统计"""
+        with self._lock:
+            throughput = self._throughput()
+            return {
+                "limit": self.limit,
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "running": self.running,
+                "queued": self.in_flight - self.running,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "completed": self.completed,
+                "service_seconds": round(self.service_time, 4) if self.service_time else None,
+                "throughput_per_second": round(throughput, 4) if throughput else None,
+                "estimated_wait_seconds": round(self._estimated_wait(), 3),
+            }
+
+
+class AdmissionController:
+    """按端点的准入控制"""
+
+    def __init__(self, gates):
+        """
+        Args:
+            gates: {端点名称: (排队上限, 并发数)}
+        """
+        self.gates = {
+            name: EndpointGate(name, limit, concurrency)
+            for name, (limit, concurrency) in gates.items()
+        }
+
+    def admit(self, endpoint):
+        """申请准入（见 EndpointGate.admit）"""
+        return self.gates[endpoint].admit()
+
+    def stats(self):
+        """返回所有端点的排队统计"""
+        return {name: gate.stats() for name, gate in self.gates.items()}
+
+
+def parse_limits(spec):
+    """
+    解析排队上限配置
+
+    Args:
+        spec: 形如 "translate=64,transcribe=8" 的字符串
+
+    Returns:
+        {端点名称: 上限}
+    """
+    limits = {}
+    for item in spec.split(","):
+        if "=" in item:
+            name, value = item.split("=", 1)
+            limits[name.strip()] = int(value)
+    return limits
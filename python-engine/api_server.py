@@ -6,16 +6,40 @@ QuickTrans API 服务器 - 完整版本
 
 import sys
 import os
+import asyncio
+import json
 import time
+import threading
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Request
+from types import SimpleNamespace
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 
-# 导入功能模块
-from faster_whisper import WhisperModel
+# 导入功能模块（faster_whisper 在首次加载 Whisper 模型时才导入，保证端口尽快就绪）
 from translator import TranslationManager, SUPPORTED_LANGUAGES
+from translation_cache import TranslationCache
+from translation_pipeline import TranslationPipeline
+from segmentation import join_translations
+from translation_scheduler import TranslationScheduler
+from lane_scheduler import LaneScheduler, INTERACTIVE, BULK
+from admission import AdmissionController, Overloaded, parse_limits
+from model_status import model_status, WARM, FAILED
+from jobs import JobManager, COMPLETED
+from transcription_cache import TranscriptionCache, hash_file
+from audio_store import DecodedAudioStore
+from audio_stream import StreamingTranscription
+import language_detect
+from live_transcribe import LiveTranscriber, PCM_FORMATS, pcm_to_float
+from uploads import UploadSpool, MultipartUploadParser, UploadTooLarge, UploadSpoolFull
+import parallel_transcribe
+import bulk_transcribe
+from whisper_registry import (
+    WhisperModelRegistry, WHISPER_MODEL_SIZES, WHISPER_COMPUTE_TYPES, status_name
+)
 
 # 创建 FastAPI 应用
 app = FastAPI(
@@ -48,17 +72,240 @@ async def log_requests(request: Request, call_next):
     print(f"[HTTP] Response status: {response.status_code}")
     return response
 
-# 全局模型实例（懒加载）
-whisper_model = None
-translation_manager = TranslationManager()
+# ==================== 服务配置 ====================
+
+# 批量翻译时每次 generate 的最大文本条数
+TRANSLATION_BATCH_SIZE = int(os.environ.get("QUICKTRANS_TRANSLATION_BATCH_SIZE", "16"))
+
+# 翻译缓存：最大条数、最大字节数（MB），以及可选的 SQLite 持久化路径（为空则仅内存）
+TRANSLATION_CACHE_ENTRIES = int(os.environ.get("QUICKTRANS_TRANSLATION_CACHE_ENTRIES", "10000"))
+TRANSLATION_CACHE_MB = int(os.environ.get("QUICKTRANS_TRANSLATION_CACHE_MB", "64"))
+TRANSLATION_CACHE_PATH = os.environ.get("QUICKTRANS_TRANSLATION_CACHE_PATH", "")
+
+# 翻译后端：transformers（PyTorch float32）或 ctranslate2（默认 int8 量化）
+TRANSLATION_BACKEND = os.environ.get("QUICKTRANS_TRANSLATION_BACKEND", "transformers")
+CT2_COMPUTE_TYPE = os.environ.get("QUICKTRANS_CT2_COMPUTE_TYPE", "int8")
+
+# 翻译模型内存预算（MB，0 表示不限制）与空闲卸载时间（秒，0 表示不卸载）
+TRANSLATION_MEMORY_MB = int(os.environ.get("QUICKTRANS_TRANSLATION_MEMORY_MB", "1024"))
+TRANSLATOR_IDLE_SECONDS = int(os.environ.get("QUICKTRANS_TRANSLATOR_IDLE_SECONDS", "0"))
+
+# 并发翻译请求的合并窗口（毫秒，0 表示不合并）与每批最多合并的请求数
+TRANSLATION_BATCH_WINDOW_MS = int(os.environ.get("QUICKTRANS_TRANSLATION_BATCH_WINDOW_MS", "10"))
+TRANSLATION_MAX_BATCH = int(os.environ.get("QUICKTRANS_TRANSLATION_MAX_BATCH", "32"))
+
+# 启动预加载：是否预加载 Whisper，以及要预加载的翻译语言对（逗号分隔，如 "zh-en,en-zh"）
+PRELOAD_WHISPER = os.environ.get("QUICKTRANS_PRELOAD_WHISPER", "0") == "1"
+PRELOAD_TRANSLATION_PAIRS = [
+    pair.strip()
+    for pair in os.environ.get("QUICKTRANS_PRELOAD_TRANSLATION_PAIRS", "").split(",")
+    if pair.strip()
+]
+
+# 异步任务：同时执行的转录任务数，以及最多保留的已结束任务数
+JOB_WORKERS = int(os.environ.get("QUICKTRANS_JOB_WORKERS", "1"))
+JOB_MAX_FINISHED = int(os.environ.get("QUICKTRANS_JOB_MAX_FINISHED", "200"))
+
+# Whisper 默认模型参数（请求可单独指定）：模型大小、计算类型、CPU 线程数
+# （0 表示自动；设置了 QUICKTRANS_INTERACTIVE_THREADS 时按批量通道的预留线程分配）
+WHISPER_MODEL_SIZE = os.environ.get("QUICKTRANS_WHISPER_MODEL", "small")
+WHISPER_COMPUTE_TYPE = os.environ.get("QUICKTRANS_WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.environ.get("QUICKTRANS_WHISPER_CPU_THREADS", "0"))
+
+# 同时常驻内存的 Whisper 模型变体数上限（多进程转录进程池计为一个变体）
+WHISPER_MAX_RESIDENT = int(os.environ.get("QUICKTRANS_WHISPER_MAX_RESIDENT", "2"))
+
+# 多进程并行转录的最大工作进程数（请求的 parallel_workers 不会超过该值）
+PARALLEL_MAX_WORKERS = int(os.environ.get("QUICKTRANS_PARALLEL_MAX_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+
+# 多进程转录进程池在最后一个任务结束后保留的秒数（0 表示一直保留）
+PARALLEL_IDLE_SECONDS = int(os.environ.get("QUICKTRANS_PARALLEL_IDLE_SECONDS", "300"))
+
+# 转录结果缓存目录与磁盘预算（MB，0 表示禁用缓存）
+TRANSCRIPTION_CACHE_DIR = os.environ.get(
+    "QUICKTRANS_TRANSCRIPTION_CACHE_DIR",
+    str(Path.home() / ".cache" / "quicktrans" / "transcriptions")
+)
+TRANSCRIPTION_CACHE_MB = int(os.environ.get("QUICKTRANS_TRANSCRIPTION_CACHE_MB", "512"))
+
+# 解码音频（16 kHz float32 PCM）缓存目录与磁盘预算（MB，0 表示禁用）
+AUDIO_CACHE_DIR = os.environ.get(
+    "QUICKTRANS_AUDIO_CACHE_DIR",
+    str(Path.home() / ".cache" / "quicktrans" / "audio")
+)
+AUDIO_CACHE_MB = int(os.environ.get("QUICKTRANS_AUDIO_CACHE_MB", "2048"))
+
+# 流式解码模式的窗口长度与相邻窗口重叠（秒）
+STREAM_WINDOW_SECONDS = int(os.environ.get("QUICKTRANS_STREAM_WINDOW_SECONDS", "300"))
+STREAM_OVERLAP_SECONDS = int(os.environ.get("QUICKTRANS_STREAM_OVERLAP_SECONDS", "5"))
+
+# 语言检测使用的模型大小（为空时使用 QUICKTRANS_WHISPER_MODEL；tiny / base 可把检测耗时压到亚秒级）
+DETECT_LANGUAGE_MODEL_SIZE = os.environ.get("QUICKTRANS_DETECT_LANGUAGE_MODEL", "")
+
+# 实时转录：两次解码之间至少新到达的音频（秒），未确认缓冲区上限（秒）
+LIVE_MIN_CHUNK_SECONDS = float(os.environ.get("QUICKTRANS_LIVE_MIN_CHUNK_SECONDS", "1.0"))
+LIVE_MAX_BUFFER_SECONDS = float(os.environ.get("QUICKTRANS_LIVE_MAX_BUFFER_SECONDS", "20"))
+
+# 音频上传：临时目录及其总容量、保存在内存中的大小阈值、单个上传的大小上限
+UPLOAD_DIR = os.environ.get("QUICKTRANS_UPLOAD_DIR", "")
+UPLOAD_SPOOL_MB = int(os.environ.get("QUICKTRANS_UPLOAD_SPOOL_MB", "4096"))
+UPLOAD_MEMORY_MB = int(os.environ.get("QUICKTRANS_UPLOAD_MEMORY_MB", "16"))
+UPLOAD_MAX_MB = int(os.environ.get("QUICKTRANS_UPLOAD_MAX_MB", "2048"))
+
+# 优先级通道：交互通道（翻译、语言检测、实时转录）与批量通道（文件转录、后台任务）的并发上限，
+# 以及预留给交互通道的 CPU 线程数（其余线程归批量通道；0 表示不划分，各模型按自身设置使用全部核心）
+INTERACTIVE_CONCURRENCY = int(os.environ.get("QUICKTRANS_INTERACTIVE_CONCURRENCY", "8"))
+BULK_CONCURRENCY = int(os.environ.get("QUICKTRANS_BULK_CONCURRENCY", "2"))
+INTERACTIVE_THREADS = int(os.environ.get("QUICKTRANS_INTERACTIVE_THREADS", "0"))
+
+# 准入控制：每个端点排队与执行中的请求总数上限（0 表示不限制），
+# 可用 QUICKTRANS_QUEUE_LIMITS 覆盖，如 "translate=128,transcribe=4"
+QUEUE_LIMITS = {
+    "translate": 64,
+    "translate-batch": 16,
+    "detect-language": 16,
+    "transcribe": 8,
+    "upload": 4,
+    "transcribe-and-translate": 4,
+    "jobs": 100,
+    "live": 4,
+    **parse_limits(os.environ.get("QUICKTRANS_QUEUE_LIMITS", "")),
+}
+
+# 全局服务实例（由 init_services 在服务启动时创建）
+# 多进程转录的 spawn 子进程会重新导入本模块，模块顶层不能有副作用：
+# 否则每个子进程都会再建一套缓存与线程，并清理父进程仍在接收的上传临时文件
+lane_scheduler = None
+admission = None
+WHISPER_DEFAULT_THREADS = WHISPER_CPU_THREADS
+whisper_registry = None
+transcription_cache = None
+audio_store = None
+upload_spool = None
+translation_cache = None
+translation_manager = None
+job_manager = None
+translation_scheduler = None
+
+
+def _idle_unload_loop():
+    """后台线程：定期卸载空闲的翻译器"""
+    while True:
+        time.sleep(max(1, min(60, TRANSLATOR_IDLE_SECONDS)))
+        translation_manager.unload_idle()
+
+
+def _parallel_idle_loop():
+    """后台线程：定期关闭空闲的多进程转录进程池，释放各工作进程中的模型"""
+    while True:
+        time.sleep(max(1, min(60, PARALLEL_IDLE_SECONDS)))
+        parallel_transcribe.unload_idle(PARALLEL_IDLE_SECONDS)
+
+
+@app.on_event("startup")
+def init_services():
+    """创建调度器、缓存、模型管理器等全局服务实例（重复调用时不再创建）"""
+    global lane_scheduler, admission, WHISPER_DEFAULT_THREADS, whisper_registry, transcription_cache
+    global audio_store, upload_spool, translation_cache, translation_manager, job_manager
+    global translation_scheduler
+
+    if lane_scheduler is not None:
+        return
+
+    lane_scheduler = LaneScheduler(
+        interactive_concurrency=INTERACTIVE_CONCURRENCY,
+        bulk_concurrency=BULK_CONCURRENCY,
+        interactive_threads=INTERACTIVE_THREADS
+    )
+    admission = AdmissionController({
+        "translate": (QUEUE_LIMITS["translate"], INTERACTIVE_CONCURRENCY),
+        "translate-batch": (QUEUE_LIMITS["translate-batch"], INTERACTIVE_CONCURRENCY),
+        "detect-language": (QUEUE_LIMITS["detect-language"], INTERACTIVE_CONCURRENCY),
+        "transcribe": (QUEUE_LIMITS["transcribe"], BULK_CONCURRENCY),
+        "upload": (QUEUE_LIMITS["upload"], BULK_CONCURRENCY),
+        "transcribe-and-translate": (QUEUE_LIMITS["transcribe-and-translate"], BULK_CONCURRENCY),
+        "jobs": (QUEUE_LIMITS["jobs"], JOB_WORKERS),
+        "live": (QUEUE_LIMITS["live"], QUEUE_LIMITS["live"] or 1),
+    })
+    # 划分了通道线程时，未指定线程数的 Whisper 模型与多进程工作池只使用批量通道的线程
+    WHISPER_DEFAULT_THREADS = WHISPER_CPU_THREADS or lane_scheduler.threads_per_task(BULK)
+    if lane_scheduler.lanes[BULK].threads:
+        parallel_transcribe.set_cpu_budget(lane_scheduler.lanes[BULK].threads)
+    whisper_registry = WhisperModelRegistry(max_resident=WHISPER_MAX_RESIDENT)
+    # 多进程转录工作进程中的模型计入常驻模型上限
+    parallel_transcribe.set_pool_listener(whisper_registry.set_external)
+    transcription_cache = (
+        TranscriptionCache(TRANSCRIPTION_CACHE_DIR, max_bytes=TRANSCRIPTION_CACHE_MB * 1024 * 1024)
+        if TRANSCRIPTION_CACHE_MB > 0 else None
+    )
+    audio_store = (
+        DecodedAudioStore(
+            AUDIO_CACHE_DIR,
+            max_bytes=AUDIO_CACHE_MB * 1024 * 1024,
+            digest_fn=transcription_cache.file_digest if transcription_cache is not None else hash_file
+        )
+        if AUDIO_CACHE_MB > 0 else None
+    )
+    upload_spool = UploadSpool(
+        UPLOAD_DIR or None,
+        max_bytes=UPLOAD_SPOOL_MB * 1024 * 1024,
+        memory_threshold=UPLOAD_MEMORY_MB * 1024 * 1024,
+        max_file_bytes=UPLOAD_MAX_MB * 1024 * 1024
+    )
+    translation_cache = TranslationCache(
+        max_entries=TRANSLATION_CACHE_ENTRIES,
+        max_bytes=TRANSLATION_CACHE_MB * 1024 * 1024,
+        db_path=TRANSLATION_CACHE_PATH or None
+    )
+    translation_options = None
+    if TRANSLATION_BACKEND == "ctranslate2":
+        translation_options = {"compute_type": CT2_COMPUTE_TYPE}
+        # CTranslate2 的线程数只作用于该翻译器；PyTorch 的线程数是进程级设置，不按通道份额设置
+        if lane_scheduler.lanes[INTERACTIVE].threads:
+            translation_options["cpu_threads"] = lane_scheduler.lanes[INTERACTIVE].threads
+    translation_manager = TranslationManager(
+        batch_size=TRANSLATION_BATCH_SIZE,
+        cache=translation_cache,
+        backend=TRANSLATION_BACKEND,
+        backend_options=translation_options,
+        memory_budget_bytes=TRANSLATION_MEMORY_MB * 1024 * 1024 or None,
+        idle_timeout=TRANSLATOR_IDLE_SECONDS or None
+    )
+    job_manager = JobManager(max_workers=JOB_WORKERS, max_finished=JOB_MAX_FINISHED)
+    translation_scheduler = TranslationScheduler(
+        translation_manager,
+        window_ms=TRANSLATION_BATCH_WINDOW_MS,
+        max_batch_size=TRANSLATION_MAX_BATCH,
+        # 只有执行批量翻译的请求占用交互通道名额，等待合并的请求不会让批量任务暂停
+        slot=lambda: lane_scheduler.slot(INTERACTIVE)
+    )
+
+    if TRANSLATOR_IDLE_SECONDS:
+        threading.Thread(target=_idle_unload_loop, name="translator-idle-unload", daemon=True).start()
+    if PARALLEL_IDLE_SECONDS:
+        threading.Thread(target=_parallel_idle_loop, name="parallel-idle-unload", daemon=True).start()
 
 
 # ==================== 请求/响应模型 ====================
 
-class TranscriptionRequest(BaseModel):
+class VadOptions(BaseModel):
+    vad_filter: bool = False
+    vad_threshold: float = 0.5
+    vad_min_silence_ms: int = 2000
+    vad_speech_pad_ms: int = 400
+
+
+class TranscriptionRequest(VadOptions):
     audio_path: str
     language: str = "auto"
     task: str = "transcribe"
+    model_size: str | None = None
+    compute_type: str | None = None
+    cpu_threads: int | None = None
+    batched: bool = False
+    batch_size: int = 8
+    parallel_workers: int = 0
+    streaming_decode: bool = False
 
 
 class TranscriptionResponse(BaseModel):
@@ -68,6 +315,30 @@ class TranscriptionResponse(BaseModel):
     duration: float
     processing_time: float
     segments: list
+    cached: bool = False
+    mode: str = "sequential"
+    real_time_factor: float = 0.0
+    skipped_seconds: float = 0.0
+
+
+class LanguageDetectionRequest(BaseModel):
+    audio_path: str
+    model_size: str | None = None
+    compute_type: str | None = None
+    windows: int = 1
+    window_seconds: float = 30.0
+    top_k: int = 5
+
+
+class BulkTranscriptionRequest(VadOptions):
+    input_path: str
+    output_path: str
+    recursive: bool = True
+    language: str = "auto"
+    task: str = "transcribe"
+    model_size: str | None = None
+    compute_type: str | None = None
+    workers: int = 0
 
 
 class TranslationRequest(BaseModel):
@@ -83,26 +354,166 @@ class TranslationResponse(BaseModel):
     target_lang: str
 
 
-class TranscribeAndTranslateRequest(BaseModel):
+class TranscribeAndTranslateRequest(VadOptions):
     audio_path: str
     source_lang: str = "auto"
     target_lang: str = "en"
+    model_size: str | None = None
+    compute_type: str | None = None
 
 
 # ==================== 辅助函数 ====================
 
-def get_whisper_model():
-    """懒加载 Whisper 模型"""
-    global whisper_model
-    if whisper_model is None:
-        print("正在加载 Whisper 模型...")
-        whisper_model = WhisperModel(
-            "small",
-            device="cpu",
-            compute_type="float32"
-        )
-        print("✓ Whisper 模型加载完成")
-    return whisper_model
+def resolve_whisper_options(request):
+    """
+    解析请求中的 Whisper 模型参数（未指定的使用服务器默认值）
+
+    Returns:
+        (model_size, compute_type, cpu_threads)
+    """
+    model_size = getattr(request, "model_size", None) or WHISPER_MODEL_SIZE
+    compute_type = getattr(request, "compute_type", None) or WHISPER_COMPUTE_TYPE
+    cpu_threads = getattr(request, "cpu_threads", None)
+    cpu_threads = WHISPER_DEFAULT_THREADS if cpu_threads is None else cpu_threads
+    batch_size = getattr(request, "batch_size", 1)
+
+    if model_size not in WHISPER_MODEL_SIZES:
+        raise HTTPException(status_code=400, detail=f"不支持的模型大小: {model_size}")
+    if compute_type not in WHISPER_COMPUTE_TYPES:
+        raise HTTPException(status_code=400, detail=f"不支持的计算类型: {compute_type}")
+    if cpu_threads < 0:
+        raise HTTPException(status_code=400, detail=f"无效的 CPU 线程数: {cpu_threads}")
+    if batch_size < 1:
+        raise HTTPException(status_code=400, detail=f"无效的批大小: {batch_size}")
+    if getattr(request, "parallel_workers", 0) < 0:
+        raise HTTPException(status_code=400, detail="parallel_workers 不能为负数")
+    if not 0 < request.vad_threshold < 1:
+        raise HTTPException(status_code=400, detail=f"无效的 VAD 阈值: {request.vad_threshold}")
+    if request.vad_min_silence_ms < 0 or request.vad_speech_pad_ms < 0:
+        raise HTTPException(status_code=400, detail="VAD 时长参数不能为负数")
+    return model_size, compute_type, cpu_threads
+
+
+def admit(endpoint):
+    """
+    申请端点的准入许可
+
+    Returns:
+        admission.Ticket（请求结束时调用 done）
+
+    Raises:
+        HTTPException: 端点排队已满时返回 429，Retry-After 为按当前吞吐量估算的重试时间
+    """
+    try:
+        return admission.admit(endpoint)
+    except Overloaded as e:
+        print(f"[ADMISSION] 拒绝 {endpoint} 请求: {e}")
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+
+def transcribe_options(request, language):
+    """
+    构造 model.transcribe 的参数（语言、任务、VAD 静音过滤）
+
+    Args:
+        request: 转录请求（TranscriptionRequest 或 TranscribeAndTranslateRequest）
+        language: 语言代码（"auto" 表示自动检测）
+
+    Returns:
+        参数 dict
+    """
+    options = {
+        "language": language if language != "auto" else None,
+        "task": getattr(request, "task", "transcribe"),
+    }
+    if request.vad_filter:
+        options["vad_filter"] = True
+        options["vad_parameters"] = {
+            "threshold": request.vad_threshold,
+            "min_silence_duration_ms": request.vad_min_silence_ms,
+            "speech_pad_ms": request.vad_speech_pad_ms,
+        }
+    return options
+
+
+def skipped_seconds(info):
+    """VAD 跳过的静音时长（秒）"""
+    after_vad = getattr(info, "duration_after_vad", None)
+    if after_vad is None:
+        return 0.0
+    return max(0.0, info.duration - after_vad)
+
+
+def audio_input(audio_path):
+    """
+    返回送入 Whisper 的音频
+
+    启用解码音频缓存时返回 16 kHz PCM 的只读 memmap（同一文件只解码一次），
+    否则返回文件路径，由 faster-whisper 自行解码。
+    """
+    if audio_store is None:
+        return str(audio_path)
+    return audio_store.load(audio_path)
+
+
+def get_whisper_model(model_size=None, compute_type=None, cpu_threads=None):
+    """
+    懒加载 Whisper 模型
+
+    模型按（大小、计算类型、CPU 线程数）登记，未指定的参数使用服务器默认值。
+    并发的冷启动请求只会触发一次加载，其余请求等待同一次加载的结果；
+    加载失败时所有等待者都会收到异常，下一次请求会重新尝试加载。
+    """
+    return whisper_registry.get(
+        model_size or WHISPER_MODEL_SIZE,
+        compute_type or WHISPER_COMPUTE_TYPE,
+        WHISPER_DEFAULT_THREADS if cpu_threads is None else cpu_threads
+    )
+
+
+def warmup_models():
+    """
+    预加载并预热配置中的模型
+
+    每个模型加载后执行一次空推理，使计算内核与内存分配器进入热状态；
+    单个模型失败不影响其余模型。
+    """
+    if PRELOAD_WHISPER:
+        try:
+            import numpy as np
+            model = get_whisper_model()
+            # 1 秒静音即可触发一次完整的编码/解码路径
+            segments, _ = model.transcribe(np.zeros(16000, dtype=np.float32), language="en")
+            list(segments)
+            print("[WARMUP] Whisper 预热完成")
+        except Exception as e:
+            print(f"[WARMUP] Whisper 预热失败: {e}")
+
+    for pair in PRELOAD_TRANSLATION_PAIRS:
+        try:
+            source_lang, target_lang = pair.split("-", 1)
+            translator = translation_manager.get_translator(source_lang, target_lang)
+            translation_manager.ensure_loaded(translator)
+            # 直接调用翻译器，绕过翻译缓存，保证真正执行一次推理
+            translator.translate("warmup")
+            print(f"[WARMUP] 翻译模型 {pair} 预热完成")
+        except Exception as e:
+            model_status.set(f"translator:{pair}", FAILED, error=str(e))
+            print(f"[WARMUP] 翻译模型 {pair} 预热失败: {e}")
+
+
+@app.on_event("shutdown")
+def stop_parallel_workers():
+    """关闭多进程转录的常驻工作进程与通道线程池"""
+    parallel_transcribe.shutdown_pools()
+    lane_scheduler.shutdown()
+
+
+@app.on_event("startup")
+def start_warmup():
+    """启动后在后台线程预加载模型，不阻塞端口监听"""
+    if PRELOAD_WHISPER or PRELOAD_TRANSLATION_PAIRS:
+        threading.Thread(target=warmup_models, name="model-warmup", daemon=True).start()
 
 
 def validate_language(lang_code: str) -> bool:
@@ -165,6 +576,52 @@ def health_check():
     }
 
 
+@app.get("/ready", tags=["基础接口"])
+def readiness_check():
+    """
+    就绪检查
+
+    返回每个模型的状态（cold / loading / warm / failed）。
+    配置的预加载模型全部为 warm 时返回 200，否则返回 503。
+    """
+    models = model_status.snapshot()
+    default_whisper = status_name((WHISPER_MODEL_SIZE, WHISPER_COMPUTE_TYPE, WHISPER_DEFAULT_THREADS))
+    preload = ([default_whisper] if PRELOAD_WHISPER else []) + [
+        f"translator:{pair}" for pair in PRELOAD_TRANSLATION_PAIRS
+    ]
+    ready = all(model_status.get(name) == WARM for name in preload)
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "preload": preload,
+            "models": models
+        }
+    )
+
+
+@app.get("/api/scheduler", tags=["信息"])
+def get_scheduler_stats():
+    """
+    优先级通道状态
+
+    返回交互 / 批量通道的并发上限、预留 CPU 线程、执行中与排队的任务数、
+    最近执行耗时的 p50 / p99，以及批量任务被抢占的次数与暂停总时长。
+    """
+    return lane_scheduler.stats()
+
+
+@app.get("/api/admission", tags=["信息"])
+def get_admission_stats():
+    """
+    准入控制状态
+
+    返回每个端点的排队上限、执行中与排队的请求数、准入 / 拒绝 / 完成计数、
+    平均服务时间、估算吞吐量与新请求的预计排队时间。
+    """
+    return admission.stats()
+
+
 @app.get("/api/languages", tags=["信息"])
 def get_supported_languages():
     """获取支持的语言列表"""
@@ -185,7 +642,7 @@ def get_supported_languages():
 # ==================== 音频转录接口 ====================
 
 @app.post("/api/transcribe", tags=["音频处理"], response_model=TranscriptionResponse)
-def transcribe_audio(request: TranscriptionRequest):
+async def transcribe_audio(request: TranscriptionRequest):
     """
     音频转录（离线）
 
@@ -198,55 +655,853 @@ def transcribe_audio(request: TranscriptionRequest):
     - **audio_path**: 音频文件路径（绝对或相对路径）
     - **language**: 语言代码（可选，默认 "auto" 自动检测）
     - **task**: 任务类型（"transcribe" 转录 或 "translate" 翻译成英文）
+    - **model_size**: 模型大小（可选，如 tiny / small / medium，默认由服务器配置）
+    - **compute_type**: 计算类型（可选，如 int8 / int8_float32 / float32，默认 int8）
+    - **cpu_threads**: CPU 线程数（可选，0 表示自动）
+    - **batched**: 长音频批量模式（可选，VAD 切分后成批并行解码，适合多核服务器）
+    - **batch_size**: 批量模式每批片段数（默认 8）
+    - **parallel_workers**: 多进程并行模式的进程数（可选，大于 1 时启用；
+      长音频在静音处切段，各进程并行转录后按时间拼接，上限由 QUICKTRANS_PARALLEL_MAX_WORKERS 控制）
+    - **streaming_decode**: 流式解码模式（可选，按固定窗口解码并逐窗口转录，
+      多小时录音的峰值内存不随时长增长）
+    - **vad_filter**: 是否用 VAD 跳过静音（可选，默认 false）
+    - **vad_threshold**: 语音概率阈值（默认 0.5，越高越严格）
+    - **vad_min_silence_ms**: 至少多长的静音才被跳过（默认 2000 ms）
+    - **vad_speech_pad_ms**: 语音片段两端保留的余量（默认 400 ms）
 
     ## 返回信息
     - 检测到的语言及置信度
     - 音频时长
-    - 处理时间
+    - 处理时间与实时率（real_time_factor = 处理时间 / 音频时长）
+    - VAD 跳过的静音时长（skipped_seconds）
     - 分段转录结果
+
+    转录在批量通道中执行（不占用交互请求的线程与 CPU 核心）；命中转录缓存的请求不进入批量通道，直接返回。
     """
     # 检查文件是否存在
     audio_path = Path(request.audio_path)
     if not audio_path.exists():
         raise HTTPException(status_code=404, detail=f"文件不存在: {request.audio_path}")
 
-    # 获取模型
-    model = get_whisper_model()
+    resolve_whisper_options(request)
 
+    ticket = admit("transcribe")
     try:
-        start_time = time.time()
+        return TranscriptionResponse(**await transcribe_in_bulk_lane(ticket, request))
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"转录失败: {str(e)}")
+    finally:
+        ticket.done()
+
+
+async def transcribe_in_bulk_lane(ticket, request, audio=None, digest=None):
+    """
+    先查转录缓存，未命中时才在批量通道中转录
+
+    Args:
+        ticket: 准入许可（开始转录或命中缓存时标记为开始执行）
+        request: 转录请求
+        audio / digest: 同 run_transcription
+
+    Returns:
+        TranscriptionResponse 的字段 dict
+    """
+    plan, cached = await run_in_threadpool(plan_transcription, request, audio, digest)
+    if cached is not None:
+        ticket.start()
+        return cached_transcription(plan, cached)
+    return await lane_scheduler.run(
+        BULK, ticket.run, run_transcription, request, audio=audio, digest=digest, plan=plan
+    )
 
-        # 执行转录
-        segments, info = model.transcribe(
-            str(audio_path),
-            language=request.language if request.language != "auto" else None,
-            task=request.task
+
+@app.post("/api/transcribe/upload", tags=["音频处理"], response_model=TranscriptionResponse)
+async def transcribe_upload(request: Request):
+    """
+    上传音频并转录（离线）
+
+    无需先把文件复制到服务器磁盘。请求体可以是：
+    - multipart/form-data：文件字段（带 filename）之外的字段作为转录参数
+    - 原始音频字节（如 application/octet-stream）：转录参数放在查询字符串中
+
+    转录参数与 /api/transcribe 相同（audio_path 除外）。
+    上传边接收边计算 SHA-256：内容相同的音频已有转录结果时直接返回缓存，不再解码。
+    不超过 QUICKTRANS_UPLOAD_MEMORY_MB 的上传只保存在内存中并直接从内存解码，
+    更大的上传写入容量受 QUICKTRANS_UPLOAD_SPOOL_MB 限制的临时目录，转录完成后删除。
+
+    ## 错误
+    - 413：超过 QUICKTRANS_UPLOAD_MAX_MB
+    - 503：临时目录已满
+    """
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > upload_spool.max_file_bytes:
+        raise HTTPException(status_code=413, detail=f"上传文件超过 {UPLOAD_MAX_MB} MB")
+
+    # 在接收请求体之前做准入判断，饱和时不必先接收整个文件
+    ticket = admit("upload")
+    content_type = request.headers.get("content-type", "")
+    parser = None
+    upload = None
+    try:
+        try:
+            if content_type.startswith("multipart/form-data"):
+                parser = MultipartUploadParser(content_type, upload_spool)
+                async for chunk in request.stream():
+                    parser.feed(chunk)
+                upload = parser.finish()
+                fields = parser.fields
+                if upload is None:
+                    raise HTTPException(status_code=400, detail="multipart 请求中没有文件字段")
+            else:
+                upload = upload_spool.open(request.query_params.get("filename"))
+                async for chunk in request.stream():
+                    upload.write(chunk)
+                fields = {}
+            digest = upload.finish()
+        except UploadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        except UploadSpoolFull as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if upload.size == 0:
+            raise HTTPException(status_code=400, detail="上传内容为空")
+
+        params = {**request.query_params, **fields}
+        try:
+            transcription_request = TranscriptionRequest(
+                audio_path=upload.path or upload.filename or "upload",
+                **{
+                    key: value for key, value in params.items()
+                    if key in TranscriptionRequest.model_fields and key != "audio_path"
+                }
+            )
+        except ValidationError as e:
+            raise HTTPException(status_code=400, detail=f"无效的参数: {e}")
+        resolve_whisper_options(transcription_request)
+
+        if upload.path is not None and transcription_cache is not None:
+            # 临时文件的哈希已在接收时算好，解码缓存等按路径查哈希的地方直接复用
+            transcription_cache.remember_digest(upload.path, digest)
+
+        try:
+            result = await transcribe_in_bulk_lane(
+                ticket,
+                transcription_request,
+                audio=upload.source() if upload.in_memory else None,
+                digest=digest
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"转录失败: {str(e)}")
+        return TranscriptionResponse(**result)
+
+    finally:
+        ticket.done()
+        upload = upload or (parser.upload if parser is not None else None)
+        if upload is not None:
+            if upload.path is not None and transcription_cache is not None:
+                transcription_cache.forget_digest(upload.path)
+            upload.close()
+
+
+@app.get("/api/transcribe/uploads", tags=["音频处理"])
+def get_upload_stats():
+    """上传临时区状态（进行中的上传数、临时文件占用字节数、上传与拒绝计数）"""
+    return upload_spool.stats()
+
+
+def open_segments(request, model, mode, options, audio=None):
+    """
+    开始转录，返回惰性的分段迭代器与转录信息
+
+    Args:
+        request: 转录请求
+        model: WhisperModel 实例
+        mode: sequential / batched / streaming
+        options: model.transcribe 的参数
+        audio: 已在内存中的音频（文件对象或波形，streaming 模式不支持）；
+            为 None 时从 request.audio_path 读取
+
+    Returns:
+        (分段 dict 迭代器, info)；streaming 模式下 info 的语言在第一个分段产出前确定
+    """
+    if mode == "streaming":
+        # 流式解码模式：按窗口解码并送入 Whisper，峰值内存与音频时长无关
+        stream = StreamingTranscription(
+            model,
+            request.audio_path,
+            options,
+            window_seconds=STREAM_WINDOW_SECONDS,
+            overlap_seconds=STREAM_OVERLAP_SECONDS
         )
+        return stream.segments(), stream
+
+    source = audio if audio is not None else audio_input(request.audio_path)
+    if mode == "batched":
+        # 长音频批量模式：VAD 切分后多个片段并行成批解码，充分利用多核
+        from faster_whisper import BatchedInferencePipeline
+
+        pipeline = BatchedInferencePipeline(model=model)
+        segments, info = pipeline.transcribe(
+            source,
+            batch_size=request.batch_size,
+            **options
+        )
+    else:
+        segments, info = model.transcribe(source, **options)
+
+    segment_dicts = (
+        {"start": segment.start, "end": segment.end, "text": segment.text.strip()}
+        for segment in segments
+    )
+    return segment_dicts, info
+
+
+def plan_transcription(request: TranscriptionRequest, audio=None, digest=None):
+    """
+    解析转录参数并查询转录缓存
+
+    只计算哈希与查询 SQLite，不占用批量通道：缓存命中的请求不必排在长转录之后。
+
+    Args:
+        request: 转录请求
+        audio: 已在内存中的音频（如小文件上传）
+        digest: 已知的音频内容哈希，为 None 时按文件计算
+
+    Returns:
+        (转录计划, 缓存命中的结果或 None)；命中时用 cached_transcription 生成响应
+    """
+    start_time = time.time()
+    model_size, compute_type, cpu_threads = resolve_whisper_options(request)
+    workers = min(getattr(request, "parallel_workers", 0), PARALLEL_MAX_WORKERS)
+    if workers > 1:
+        mode = "parallel"
+    elif getattr(request, "batched", False):
+        mode = "batched"
+    elif getattr(request, "streaming_decode", False) and audio is None:
+        mode = "streaming"
+    else:
+        mode = "sequential"
+    options = transcribe_options(request, request.language)
+    plan = SimpleNamespace(
+        start_time=start_time,
+        model_size=model_size,
+        compute_type=compute_type,
+        cpu_threads=cpu_threads,
+        workers=workers,
+        mode=mode,
+        options=options,
+        cache_key=None
+    )
+
+    # 先查转录缓存：同一音频内容 + 相同转录参数直接返回上次的结果
+    if transcription_cache is None:
+        return plan, None
+    if digest is None:
+        digest = transcription_cache.file_digest(request.audio_path)
+    plan.cache_key = transcription_cache.make_key(digest, {
+        "model_size": model_size,
+        "compute_type": compute_type,
+        "language": request.language,
+        "task": request.task,
+        "mode": mode,
+        "vad": options.get("vad_parameters"),
+    })
+    return plan, transcription_cache.get(plan.cache_key)
+
+
+def cached_transcription(plan, cached, segment_callback=None):
+    """由缓存命中的结果生成 run_transcription 的返回值"""
+    if segment_callback is not None:
+        for segment in cached["segments"]:
+            segment_callback(segment, cached["language"])
+    processing_time = time.time() - plan.start_time
+    return {
+        **cached,
+        "processing_time": processing_time,
+        "real_time_factor": processing_time / cached["duration"] if cached["duration"] else 0.0,
+        "cached": True
+    }
+
+
+def run_transcription(request: TranscriptionRequest, progress_callback=None, segment_callback=None,
+                      audio=None, digest=None, plan=None):
+    """
+    执行一次完整转录
+
+    Args:
+        request: 转录请求
+        progress_callback: 每解码一段调用一次，参数为进度（0-1）；
+            回调抛出异常（如任务取消）时立即停止消费分段生成器
+        segment_callback: 每得到一段调用一次，参数为（分段 dict, 检测到的语言），
+            用于在转录继续进行时处理已完成的分段（如流水线翻译）
+        audio: 已在内存中的音频（如小文件上传），为 None 时从 request.audio_path 读取
+        digest: 已知的音频内容哈希（如上传时边接收边计算），为 None 时按文件计算
+        plan: plan_transcription 返回的转录计划（调用方已确认缓存未命中）；为 None 时在此查询缓存
+
+    Returns:
+        TranscriptionResponse 的字段 dict
+    """
+    if plan is None:
+        plan, cached = plan_transcription(request, audio, digest)
+        if cached is not None:
+            return cached_transcription(plan, cached, segment_callback)
+
+    start_time = time.time()
+    model_size, compute_type, cpu_threads = plan.model_size, plan.compute_type, plan.cpu_threads
+    workers, mode, options, cache_key = plan.workers, plan.mode, plan.options, plan.cache_key
+
+    # 执行转录
+    data = None
+    if mode == "parallel":
+        # 多进程模式：在静音处切段，由常驻工作进程并行转录后拼接
+        try:
+            data = parallel_transcribe.transcribe_parallel(
+                audio if audio is not None else audio_input(request.audio_path),
+                workers,
+                model_size,
+                compute_type,
+                options,
+                progress_callback=progress_callback
+            )
+        except parallel_transcribe.PoolBusy as e:
+            # 进程池被参数不同的任务（如批量转录）占用：不等待，改为在本进程中顺序转录
+            print(f"[PARALLEL] {e}，改用顺序转录")
+            mode = "sequential"
+
+    if data is not None:
+        info = SimpleNamespace(**{k: v for k, v in data.items() if k != "segments"})
+        transcription_segments = data["segments"]
+        full_text = [segment["text"] for segment in transcription_segments]
+        if segment_callback is not None:
+            for segment in transcription_segments:
+                segment_callback(segment, info.language)
+    else:
+        model = get_whisper_model(model_size, compute_type, cpu_threads)
+        segments, info = open_segments(request, model, mode, options, audio=audio)
 
         # 收集结果
         transcription_segments = []
         full_text = []
         for segment in segments:
-            transcription_segments.append({
-                "start": segment.start,
-                "end": segment.end,
-                "text": segment.text.strip()
+            transcription_segments.append(segment)
+            full_text.append(segment["text"])
+            if segment_callback is not None:
+                segment_callback(segment, info.language)
+            if progress_callback is not None:
+                progress_callback(segment["end"] / info.duration if info.duration else 1.0)
+            # 分段边界：交互通道有请求时先让出 CPU，再解码下一段
+            lane_scheduler.checkpoint()
+
+    processing_time = time.time() - start_time
+
+    result = {
+        "text": " ".join(full_text),
+        "language": info.language,
+        "language_probability": info.language_probability,
+        "duration": info.duration,
+        "processing_time": processing_time,
+        "segments": transcription_segments,
+        "cached": False,
+        "mode": mode,
+        # 实时率：处理时间 / 音频时长，越小越快，用于比较批量与顺序模式
+        "real_time_factor": processing_time / info.duration if info.duration else 0.0,
+        "skipped_seconds": skipped_seconds(info)
+    }
+    if cache_key is not None:
+        transcription_cache.put(cache_key, result)
+    return result
+
+
+@app.post("/api/transcribe/stream", tags=["音频处理"])
+def transcribe_audio_stream(request: TranscriptionRequest):
+    """
+    流式音频转录（离线）
+
+    与 /api/transcribe 参数相同，但每解码出一个分段就立即返回，
+    适合长音频：界面可以边解码边显示，响应内存占用不随音频时长增长。
+
+    ## 返回格式（NDJSON，每行一个 JSON 对象）
+    - `{"type": "info", ...}`：检测到的语言、置信度、音频时长
+    - `{"type": "segment", ...}`：一个分段（start, end, text）及当前进度 progress（0-1）
+    - `{"type": "done", ...}`：分段总数与处理时间
+    - `{"type": "error", ...}`：转录过程中出错
+    """
+    audio_path = Path(request.audio_path)
+    if not audio_path.exists():
+        raise HTTPException(status_code=404, detail=f"文件不存在: {request.audio_path}")
+
+    whisper_options = resolve_whisper_options(request)
+    ticket = admit("transcribe")
+    try:
+        model = get_whisper_model(*whisper_options)
+    except BaseException:
+        ticket.done()
+        raise
+
+    def generate():
+        # 占用批量通道的名额，逐段输出之间在分段边界让出 CPU
+        try:
+            with lane_scheduler.slot(BULK):
+                ticket.start()
+                yield from stream_segments()
+        finally:
+            ticket.done()
+
+    def stream_segments():
+        start_time = time.time()
+        try:
+            mode = "streaming" if request.streaming_decode else (
+                "batched" if request.batched else "sequential"
+            )
+            segments, info = open_segments(
+                request, model, mode, transcribe_options(request, request.language)
+            )
+
+            def info_line():
+                return json.dumps({
+                    "type": "info",
+                    "language": info.language,
+                    "language_probability": info.language_probability,
+                    "duration": info.duration,
+                    "skipped_seconds": skipped_seconds(info)
+                }, ensure_ascii=False) + "\n"
+
+            # 流式解码模式下语言在第一个窗口解码后才确定，info 推迟到第一个分段之前输出
+            info_sent = info.language is not None
+            if info_sent:
+                yield info_line()
+
+            # segments 是惰性生成器：每解码一段就输出一段，不在内存中累积
+            count = 0
+            for segment in segments:
+                if not info_sent:
+                    info_sent = True
+                    yield info_line()
+                count += 1
+                lane_scheduler.checkpoint()
+                yield json.dumps({
+                    "type": "segment",
+                    **segment,
+                    "progress": min(1.0, segment["end"] / info.duration) if info.duration else 1.0
+                }, ensure_ascii=False) + "\n"
+
+            if not info_sent:
+                yield info_line()
+
+            yield json.dumps({
+                "type": "done",
+                "segments": count,
+                "processing_time": time.time() - start_time
+            }, ensure_ascii=False) + "\n"
+        except Exception as e:
+            yield json.dumps({
+                "type": "error",
+                "detail": f"转录失败: {str(e)}"
+            }, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+@app.websocket("/api/transcribe/live")
+async def transcribe_live(websocket: WebSocket):
+    """
+    实时麦克风转录（WebSocket）
+
+    ## 连接参数（查询字符串）
+    - **language**: 语言代码（默认 auto，第一次确定文本时固定）
+    - **task**: transcribe 或 translate
+    - **model_size** / **compute_type**: 模型参数（可选）
+    - **sample_rate**: 输入采样率（默认 16000，其他采样率在服务器端重采样）
+    - **format**: s16le（默认）或 f32le，单声道小端 PCM
+
+    ## 客户端消息
+    - 二进制帧：PCM 音频
+    - `{"type": "stop"}`：结束会话，服务器确定剩余结果后关闭连接
+
+    ## 服务器消息（JSON 文本帧）
+    - `{"type": "ready"}`：模型已加载，可以开始发送音频
+    - `{"type": "partial", ...}`：临时结果（start, end, text），后续可能被修正
+    - `{"type": "final", ...}`：最终分段（start, end, text），时间为会话内的绝对时间
+    - `{"type": "done", ...}`：会话统计
+    - `{"type": "error", ...}`：出错（无效的音频帧或控制消息只回复错误，会话继续）
+    """
+    await websocket.accept()
+    try:
+        ticket = admission.admit("live")
+    except Overloaded as e:
+        await websocket.send_json({"type": "error", "detail": str(e), "retry_after": e.retry_after})
+        await websocket.close(code=1013)
+        return
+    ticket.start()
+
+    params = websocket.query_params
+    try:
+        language = params.get("language", "auto")
+        task = params.get("task", "transcribe")
+        model_size = params.get("model_size") or WHISPER_MODEL_SIZE
+        compute_type = params.get("compute_type") or WHISPER_COMPUTE_TYPE
+        sample_rate = int(params.get("sample_rate", "16000"))
+        sample_format = params.get("format", "s16le")
+        if model_size not in WHISPER_MODEL_SIZES:
+            raise ValueError(f"不支持的模型大小: {model_size}")
+        if compute_type not in WHISPER_COMPUTE_TYPES:
+            raise ValueError(f"不支持的计算类型: {compute_type}")
+        if task not in ("transcribe", "translate"):
+            raise ValueError(f"不支持的任务类型: {task}")
+        if sample_format not in PCM_FORMATS:
+            raise ValueError(f"不支持的采样格式: {sample_format}")
+        if sample_rate <= 0:
+            raise ValueError(f"无效的采样率: {sample_rate}")
+
+        model = await run_in_threadpool(get_whisper_model, model_size, compute_type)
+    except Exception as e:
+        ticket.done()
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1008)
+        return
+
+    transcriber = LiveTranscriber(
+        model,
+        language=language if language != "auto" else None,
+        task=task,
+        min_chunk_seconds=LIVE_MIN_CHUNK_SECONDS,
+        max_buffer_seconds=LIVE_MAX_BUFFER_SECONDS
+    )
+    start_time = time.time()
+    arrived = asyncio.Event()
+    stopped = asyncio.Event()
+    disconnected = False
+
+    async def receive_audio():
+        """接收协程：只负责把音频追加到缓冲区，解码在线程池中进行，互不阻塞"""
+        nonlocal disconnected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
+                if message.get("bytes"):
+                    try:
+                        samples = pcm_to_float(message["bytes"], sample_format, sample_rate)
+                    except ValueError as e:
+                        # 无效的帧只回复错误，不影响已缓冲的音频
+                        await websocket.send_json({"type": "error", "detail": f"无效的音频帧: {e}"})
+                        continue
+                    transcriber.insert_audio(samples)
+                    arrived.set()
+                elif message.get("text"):
+                    try:
+                        control = json.loads(message["text"])
+                    except ValueError:
+                        control = None
+                    if not isinstance(control, dict):
+                        await websocket.send_json({"type": "error", "detail": "无效的控制消息，应为 JSON 对象"})
+                        continue
+                    if control.get("type") == "stop":
+                        break
+        except WebSocketDisconnect:
+            disconnected = True
+        except Exception as e:
+            # 连接仍然打开：停止接收，由主循环确定剩余结果
+            print(f"[LIVE] 接收音频失败: {e}")
+        finally:
+            stopped.set()
+            arrived.set()
+
+    def segment_message(kind, segment):
+        return {
+            "type": kind,
+            **segment,
+            "language": transcriber.language,
+            # 服务器已收到的音频时长，与分段结束时间之差即为该分段的确定延迟
+            "received_seconds": round(transcriber.received_seconds, 3)
+        }
+
+    receiver = asyncio.create_task(receive_audio())
+    try:
+        await websocket.send_json({"type": "ready"})
+        while not stopped.is_set():
+            await arrived.wait()
+            arrived.clear()
+            if stopped.is_set() or not transcriber.ready:
+                continue
+            final, partial = await lane_scheduler.run(INTERACTIVE, transcriber.process)
+            if final is not None:
+                await websocket.send_json(segment_message("final", final))
+            if partial is not None:
+                await websocket.send_json(segment_message("partial", partial))
+
+        if not disconnected:
+            final = await lane_scheduler.run(INTERACTIVE, transcriber.finish)
+            if final is not None:
+                await websocket.send_json(segment_message("final", final))
+            await websocket.send_json({
+                "type": "done",
+                "language": transcriber.language,
+                "received_seconds": round(transcriber.received_seconds, 3),
+                "dropped_seconds": round(transcriber.dropped_seconds, 3),
+                "decodes": transcriber.decodes,
+                "processing_time": time.time() - start_time
             })
-            full_text.append(segment.text.strip())
+            await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        if not disconnected:
+            await websocket.send_json({"type": "error", "detail": f"转录失败: {str(e)}"})
+            await websocket.close(code=1011)
+    finally:
+        receiver.cancel()
+        ticket.done()
+
 
-        processing_time = time.time() - start_time
+@app.get("/api/transcribe/models", tags=["音频处理"])
+def get_whisper_models():
+    """
+    Whisper 模型状态
 
-        return TranscriptionResponse(
-            text=" ".join(full_text),
-            language=info.language,
-            language_probability=info.language_probability,
-            duration=info.duration,
-            processing_time=processing_time,
-            segments=transcription_segments
+    返回可选的模型大小与计算类型、服务器默认值，以及当前常驻内存的模型变体。
+    """
+    return {
+        "defaults": {
+            "model_size": WHISPER_MODEL_SIZE,
+            "compute_type": WHISPER_COMPUTE_TYPE,
+            "cpu_threads": WHISPER_DEFAULT_THREADS
+        },
+        "available_model_sizes": WHISPER_MODEL_SIZES,
+        "available_compute_types": WHISPER_COMPUTE_TYPES,
+        **whisper_registry.stats()
+    }
+
+
+@app.get("/api/transcribe/cache", tags=["音频处理"])
+def get_transcription_cache_stats():
+    """
+    转录缓存状态
+
+    返回缓存条数、占用字节数、命中/未命中/淘汰计数，以及文件哈希复用次数。
+    """
+    if transcription_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **transcription_cache.stats()}
+
+
+@app.get("/api/transcribe/audio-cache", tags=["音频处理"])
+def get_audio_cache_stats():
+    """解码音频缓存状态（16 kHz PCM 文件数、占用字节数、命中/未命中/淘汰计数）"""
+    if audio_store is None:
+        return {"enabled": False}
+    return {"enabled": True, **audio_store.stats()}
+
+
+@app.delete("/api/transcribe/cache", tags=["音频处理"])
+def clear_transcription_cache():
+    """清空转录缓存"""
+    if transcription_cache is not None:
+        transcription_cache.clear()
+    return {"status": "ok"}
+
+
+@app.post("/api/detect-language", tags=["音频处理"])
+def detect_audio_language(request: LanguageDetectionRequest):
+    """
+    语言检测（离线）
+
+    只解码开头的一个窗口（或均匀抽取的几个窗口）并运行 Whisper 语言检测，
+    耗时与音频总时长无关；结果按音频内容哈希缓存。
+
+    ## 参数说明
+    - **audio_path**: 音频文件路径
+    - **model_size**: 模型大小（可选，默认 QUICKTRANS_DETECT_LANGUAGE_MODEL 或服务器默认模型）
+    - **compute_type**: 计算类型（可选）
+    - **windows**: 抽取的窗口数（默认 1，只看开头；开头可能是静音或音乐时可设为 3）
+    - **window_seconds**: 每个窗口的长度（默认 30 秒，最大 30）
+    - **top_k**: 返回概率最高的前几种语言（默认 5）
+
+    ## 返回信息
+    - 最可能的语言及其概率
+    - top_languages：按概率排序的候选语言（多个窗口时为各窗口概率的平均值）
+    - 实际分析的窗口数与音频时长
+    """
+    audio_path = Path(request.audio_path)
+    if not audio_path.exists():
+        raise HTTPException(status_code=404, detail=f"文件不存在: {request.audio_path}")
+
+    model_size = request.model_size or DETECT_LANGUAGE_MODEL_SIZE or WHISPER_MODEL_SIZE
+    compute_type = request.compute_type or WHISPER_COMPUTE_TYPE
+    if model_size not in WHISPER_MODEL_SIZES:
+        raise HTTPException(status_code=400, detail=f"不支持的模型大小: {model_size}")
+    if model_size.endswith(".en"):
+        raise HTTPException(status_code=400, detail=f"仅英语模型不支持语言检测: {model_size}")
+    if compute_type not in WHISPER_COMPUTE_TYPES:
+        raise HTTPException(status_code=400, detail=f"不支持的计算类型: {compute_type}")
+    if request.windows < 1 or request.top_k < 1:
+        raise HTTPException(status_code=400, detail="windows 与 top_k 必须大于 0")
+    if not 0 < request.window_seconds <= language_detect.MAX_WINDOW_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"window_seconds 必须在 0 到 {language_detect.MAX_WINDOW_SECONDS} 之间"
         )
 
+    ticket = admit("detect-language")
+    start_time = time.time()
+    try:
+        cache_key = None
+        if transcription_cache is not None:
+            cache_key = transcription_cache.make_key(
+                transcription_cache.file_digest(audio_path),
+                {
+                    "kind": "language",
+                    "model_size": model_size,
+                    "compute_type": compute_type,
+                    "windows": request.windows,
+                    "window_seconds": request.window_seconds,
+                    "top_k": request.top_k,
+                }
+            )
+            cached = transcription_cache.get(cache_key)
+            if cached is not None:
+                return {**cached, "processing_time": time.time() - start_time, "cached": True}
+
+        with lane_scheduler.slot(INTERACTIVE):
+            ticket.start()
+            result = language_detect.detect_language(
+                get_whisper_model(model_size, compute_type),
+                audio_path,
+                windows=request.windows,
+                window_seconds=request.window_seconds,
+                top_k=request.top_k
+            )
+        if cache_key is not None:
+            transcription_cache.put(cache_key, result)
+        return {**result, "processing_time": time.time() - start_time, "cached": False}
+
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"转录失败: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"语言检测失败: {str(e)}")
+    finally:
+        ticket.done()
+
+
+# ==================== 异步任务接口 ====================
+
+@app.post("/api/jobs/transcribe", tags=["异步任务"], status_code=202)
+def submit_transcription_job(request: TranscriptionRequest):
+    """
+    提交异步转录任务
+
+    立即返回任务 ID，转录在后台有界线程池中执行（QUICKTRANS_JOB_WORKERS 控制并发数）。
+    通过 GET /api/jobs/{job_id} 查询状态与进度，GET /api/jobs/{job_id}/result 获取结果，
+    DELETE /api/jobs/{job_id} 取消任务。
+    """
+    if not Path(request.audio_path).exists():
+        raise HTTPException(status_code=404, detail=f"文件不存在: {request.audio_path}")
+    resolve_whisper_options(request)
+
+    def run_job(job):
+        # 命中转录缓存时不进入批量通道
+        plan, cached = plan_transcription(request)
+        if cached is not None:
+            ticket.start()
+            return cached_transcription(plan, cached)
+        return lane_scheduler.call(
+            BULK, ticket.run, run_transcription, request, progress_callback=job.report, plan=plan
+        )
+
+    ticket = admit("jobs")
+    job = job_manager.submit("transcribe", request.model_dump(), run_job)
+    # 任务结束（包括排队中被取消）时释放准入名额
+    job.future.add_done_callback(lambda _: ticket.done())
+    return job.to_dict()
+
+
+@app.post("/api/jobs/transcribe-batch", tags=["异步任务"], status_code=202)
+def submit_bulk_transcription_job(request: BulkTranscriptionRequest):
+    """
+    提交批量转录任务
+
+    转录目录（或 glob 模式匹配）下的所有音频文件，结果逐行追加写入 output_path（JSONL）。
+
+    ## 调度
+    - 先从容器元数据读取每个文件的时长（不解码），按时长从长到短分配给常驻 Whisper 工作进程
+    - 文件大小、修改时间与转录参数都未变化的已有结果直接跳过，重新运行只处理新增或修改的文件
+
+    ## 参数说明
+    - **input_path**: 目录路径或 glob 模式（如 /data/**/*.mp3）
+    - **output_path**: JSONL 结果文件路径
+    - **recursive**: 目录模式下是否包含子目录（默认 true）
+    - **workers**: 工作进程数（默认及上限为 QUICKTRANS_PARALLEL_MAX_WORKERS）
+    - 其余参数与 /api/transcribe 相同
+    """
+    if not Path(request.input_path).is_dir() and not bulk_transcribe.find_audio_files(request.input_path):
+        raise HTTPException(status_code=404, detail=f"没有找到音频文件: {request.input_path}")
+    if request.workers < 0:
+        raise HTTPException(status_code=400, detail="workers 不能为负数")
+    model_size, compute_type, _ = resolve_whisper_options(request)
+    workers = min(request.workers or PARALLEL_MAX_WORKERS, PARALLEL_MAX_WORKERS)
+
+    ticket = admit("jobs")
+    job = job_manager.submit(
+        "transcribe-batch",
+        request.model_dump(),
+        lambda job: lane_scheduler.call(
+            BULK,
+            ticket.run,
+            bulk_transcribe.transcribe_bulk,
+            request.input_path,
+            request.output_path,
+            transcribe_options(request, request.language),
+            model_size,
+            compute_type,
+            workers,
+            recursive=request.recursive,
+            progress_callback=job.report
+        )
+    )
+    job.future.add_done_callback(lambda _: ticket.done())
+    return job.to_dict()
+
+
+@app.get("/api/jobs", tags=["异步任务"])
+def list_jobs():
+    """任务列表（不含结果）"""
+    return {"jobs": [job.to_dict() for job in job_manager.list()]}
+
+
+@app.get("/api/jobs/{job_id}", tags=["异步任务"])
+def get_job(job_id: str):
+    """任务状态与进度"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return job.to_dict()
+
+
+@app.get("/api/jobs/{job_id}/result", tags=["异步任务"])
+def get_job_result(job_id: str):
+    """任务结果（任务未完成时返回 409）"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    if job.status != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"任务尚未完成: {job.status}")
+    return {**job.to_dict(), "result": job.result}
+
+
+@app.delete("/api/jobs/{job_id}", tags=["异步任务"])
+def cancel_job(job_id: str):
+    """
+    取消任务
+
+    排队中的任务直接取消；运行中的任务在下一个分段解码完成后停止，
+    不再消费分段生成器，CPU 随即释放。
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"任务不存在: {job_id}")
+    return job.to_dict()
 
 
 # ==================== 文本翻译接口 ====================
@@ -284,10 +1539,12 @@ def translate_text(request: TranslationRequest):
         print(f"[ERROR] 不支持的目标语言: {request.target_lang}")
         raise HTTPException(status_code=400, detail=f"不支持的目标语言: {request.target_lang}")
 
+    ticket = admit("translate")
     try:
         # 执行翻译
         print(f"[DEBUG] 开始翻译...")
-        result = translation_manager.translate(
+        ticket.start()
+        result = translation_scheduler.translate(
             request.text,
             request.source_lang,
             request.target_lang
@@ -309,6 +1566,8 @@ def translate_text(request: TranslationRequest):
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"翻译失败: {str(e)}")
+    finally:
+        ticket.done()
 
 
 @app.post("/api/translate/batch", tags=["翻译"])
@@ -316,45 +1575,96 @@ def translate_batch(requests: list[TranslationRequest]):
     """
     批量文本翻译（离线）
 
-    一次翻译多个文本，提高效率。
+    一次翻译多个文本，同一语言对的文本会 padding 后按批送入模型，
+    避免逐条调用 generate。
 
     ## 注意事项
-    - 所有请求必须使用相同的语言对
+    - 支持混合语言对，结果顺序与请求顺序一致
+    - 每批大小由 QUICKTRANS_TRANSLATION_BATCH_SIZE 配置（默认 16）
     - 首次使用会下载翻译模型
     """
     if not requests:
         raise HTTPException(status_code=400, detail="请求列表不能为空")
 
-    results = []
+    # 按语言对分组，每组一次性送入批量翻译
+    groups = {}
+    for index, req in enumerate(requests):
+        for lang in (req.source_lang, req.target_lang):
+            if not validate_language(lang):
+                raise HTTPException(status_code=400, detail=f"不支持的语言: {lang}")
+        groups.setdefault((req.source_lang, req.target_lang), []).append(index)
+
+    translated = [None] * len(requests)
+    ticket = admit("translate-batch")
     try:
-        for req in requests:
-            result = translation_manager.translate(
-                req.text,
-                req.source_lang,
-                req.target_lang
-            )
-            results.append({
-                "original": req.text,
-                "translated": result
-            })
+        with lane_scheduler.slot(INTERACTIVE):
+            ticket.start()
+            for (source_lang, target_lang), indices in groups.items():
+                outputs = translation_manager.translate_batch(
+                    [requests[i].text for i in indices],
+                    source_lang,
+                    target_lang
+                )
+                for i, result in zip(indices, outputs):
+                    translated[i] = result
+
+        results = [
+            {"original": req.text, "translated": result}
+            for req, result in zip(requests, translated)
+        ]
 
         return {
             "total": len(results),
             "results": results
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"批量翻译失败: {str(e)}")
+    finally:
+        ticket.done()
+
+
+@app.get("/api/translate/cache", tags=["翻译"])
+def get_translation_cache_stats():
+    """
+    翻译缓存状态
+
+    返回缓存条数、占用字节数、命中/未命中/淘汰计数。
+    """
+    return translation_cache.stats()
+
+
+@app.get("/api/translate/models", tags=["翻译"])
+def get_translation_models():
+    """
+    已加载的翻译模型
+
+    返回每个语言对的常驻内存、空闲时间，以及内存预算、累计淘汰次数和微批调度统计。
+    """
+    return {
+        **translation_manager.stats(),
+        "scheduler": translation_scheduler.stats()
+    }
+
+
+@app.delete("/api/translate/cache", tags=["翻译"])
+def clear_translation_cache():
+    """清空翻译缓存（包括持久化数据）"""
+    translation_cache.clear()
+    return {"status": "ok"}
 
 
 # ==================== 组合功能接口 ====================
 
 @app.post("/api/transcribe-and-translate", tags=["组合功能"])
-def transcribe_and_translate(request: TranscribeAndTranslateRequest):
+async def transcribe_and_translate(request: TranscribeAndTranslateRequest):
     """
     音频转录 + 翻译（一步完成）
 
-    将音频转录为文本，然后翻译成目标语言。
+    将音频转录为文本，并翻译成目标语言。转录与翻译以流水线方式执行：
+    每解码出一个分段就交给翻译线程，翻译与后续解码同时进行。
 
     ## 使用场景
     - 录音转文字并翻译
@@ -365,56 +1675,110 @@ def transcribe_and_translate(request: TranscribeAndTranslateRequest):
     - **audio_path**: 音频文件路径
     - **source_lang**: 转录语言（可选，默认 "auto"）
     - **target_lang**: 翻译目标语言（默认 "en" 英文）
+    - **vad_filter** / **vad_threshold** / **vad_min_silence_ms** / **vad_speech_pad_ms**:
+      VAD 静音过滤参数（同 /api/transcribe）
 
     ## 返回信息
     - 原始转录文本
     - 翻译后的文本
+    - 逐段译文（segments，带时间戳，可直接用作字幕）
     - 检测到的语言
     - 处理时间统计
+
+    转录与翻译在批量通道中执行；转录缓存命中时只需翻译，在交互通道中执行。
     """
     # 检查文件
     audio_path = Path(request.audio_path)
     if not audio_path.exists():
         raise HTTPException(status_code=404, detail=f"文件不存在: {request.audio_path}")
 
-    # 验证目标语言
+    # 验证目标语言与模型参数
     if not validate_language(request.target_lang):
         raise HTTPException(status_code=400, detail=f"不支持的目标语言: {request.target_lang}")
+    resolve_whisper_options(request)
 
+    ticket = admit("transcribe-and-translate")
     try:
-        start_time = time.time()
-
-        # 步骤 1: 转录
-        model = get_whisper_model()
-        segments, info = model.transcribe(
-            str(audio_path),
-            language=request.source_lang if request.source_lang != "auto" else None
+        transcription_request = TranscriptionRequest(
+            audio_path=request.audio_path,
+            language=request.source_lang,
+            model_size=request.model_size,
+            compute_type=request.compute_type,
+            vad_filter=request.vad_filter,
+            vad_threshold=request.vad_threshold,
+            vad_min_silence_ms=request.vad_min_silence_ms,
+            vad_speech_pad_ms=request.vad_speech_pad_ms
         )
+        plan, cached = await run_in_threadpool(plan_transcription, transcription_request)
+        if cached is not None:
+            # 转录缓存命中：只剩翻译，在交互通道中执行，不排在长转录之后
+            return await lane_scheduler.run(
+                INTERACTIVE, ticket.run, run_transcribe_and_translate, request, transcription_request,
+                plan, cached
+            )
+        return await lane_scheduler.run(
+            BULK, ticket.run, run_transcribe_and_translate, request, transcription_request, plan
+        )
+    finally:
+        ticket.done()
 
-        # 收集转录文本
-        transcription_text = []
-        for segment in segments:
-            transcription_text.append(segment.text.strip())
 
-        original_text = " ".join(transcription_text)
+def run_transcribe_and_translate(request: TranscribeAndTranslateRequest, transcription_request,
+                                 plan, cached=None):
+    """
+    执行一次转录 + 流水线翻译（在通道线程中运行）
+
+    Args:
+        request: 转录 + 翻译请求
+        transcription_request: 由 request 构造的转录请求
+        plan: plan_transcription 返回的转录计划
+        cached: 缓存命中的转录结果（None 表示需要转录）
+    """
+    try:
+        start_time = time.time()
 
-        # 步骤 2: 翻译
-        translated_text = translation_manager.translate(
-            original_text,
-            info.language,
-            request.target_lang
+        # 转录与翻译流水线执行：每解码出一段就交给翻译线程，转录继续进行
+        # （同一音频重复提交时命中转录缓存，直接整批翻译）
+        pipeline = TranslationPipeline(
+            translation_manager,
+            request.target_lang,
+            max_batch_size=TRANSLATION_BATCH_SIZE
         )
 
+        def feed(segment, language):
+            pipeline.feed(segment["text"], language)
+
+        try:
+            if cached is not None:
+                transcription = cached_transcription(plan, cached, segment_callback=feed)
+            else:
+                transcription = run_transcription(transcription_request, segment_callback=feed, plan=plan)
+        except Exception:
+            # 转录失败时结束翻译线程
+            pipeline.cancel()
+            raise
+        transcription_time = time.time() - start_time
+        translations = pipeline.close()
+
+        segments = [
+            {**segment, "translated_text": translated}
+            for segment, translated in zip(transcription["segments"], translations)
+        ]
+
         total_time = time.time() - start_time
 
         return {
-            "original_text": original_text,
-            "translated_text": translated_text,
-            "detected_language": info.language,
+            "original_text": transcription["text"],
+            "translated_text": join_translations(translations, request.target_lang),
+            "detected_language": transcription["language"],
             "target_language": request.target_lang,
-            "language_probability": info.language_probability,
-            "audio_duration": info.duration,
-            "processing_time": total_time
+            "language_probability": transcription["language_probability"],
+            "audio_duration": transcription["duration"],
+            "processing_time": total_time,
+            "transcription_time": transcription_time,
+            "segments": segments,
+            "skipped_seconds": transcription["skipped_seconds"],
+            "transcription_cached": transcription["cached"]
         }
 
     except Exception as e:
@@ -424,8 +1788,12 @@ def transcribe_and_translate(request: TranscribeAndTranslateRequest):
 # ==================== 服务器启动 ====================
 
 if __name__ == "__main__":
+    import multiprocessing
     import uvicorn
 
+    # PyInstaller 打包后，多进程转录的 spawn 子进程需要 freeze_support 才能正常启动
+    multiprocessing.freeze_support()
+
     print("=" * 60)
     print("QuickTrans API 服务器")
     print("=" * 60)
@@ -442,6 +1810,8 @@ if __name__ == "__main__":
     print()
     print("💡 主要功能:")
     print("   - POST /api/transcribe              (音频转录)")
+    print("   - POST /api/transcribe/stream       (流式转录)")
+    print("   - POST /api/jobs/transcribe         (异步转录任务)")
     print("   - POST /api/translate               (文本翻译)")
     print("   - POST /api/translate/batch         (批量翻译)")
     print("   - POST /api/transcribe-and-translate (转录+翻译)")
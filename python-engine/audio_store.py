@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+解码音频缓存模块 - 将解码并重采样后的 16 kHz 单声道 float32 PCM 写入缓存目录
+之后通过 numpy.memmap 读取：语言检测、换模型重试、重新转录都不再重复解码，
+且波形由操作系统按页换入，不必整体常驻堆内存
+"""
+
+import os
+import threading
+from pathlib import Path
+
+from transcription_cache import hash_file
+
+SAMPLE_RATE = 16000
+
+
+class DecodedAudioStore:
+    """解码音频缓存 - 按内容哈希存储，按磁盘预算 LRU 淘汰"""
+
+    def __init__(self, cache_dir, max_bytes=2 * 1024 * 1024 * 1024, digest_fn=None):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存 PCM 文件占用的最大字节数
+            digest_fn: 计算音频文件内容哈希的函数（可选，默认完整计算 SHA-256）
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max(1, int(max_bytes))
+        self.digest_fn = digest_fn or hash_file
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def pcm_path(self, digest):
+        """缓存的 PCM 文件路径"""
+        return self.cache_dir / f"{digest}.f32"
+
+    def load(self, audio_path):
+        """
+        返回音频的 16 kHz float32 波形（只读 memmap）
+
+        Args:
+            audio_path: 音频文件路径
+
+        Returns:
+            numpy.memmap
+        """
+        digest = self.digest_fn(audio_path)
+        path = self.pcm_path(digest)
+
+        if path.exists():
+            try:
+                # 更新修改时间作为最近使用时间，供 LRU 淘汰
+                os.utime(path)
+                audio = self.open(path)
+            except FileNotFoundError:
+                # 检查后被其他请求的淘汰删除：按未命中处理
+                pass
+            else:
+                with self._lock:
+                    self.hits += 1
+                return audio
+
+        with self._lock:
+            self.misses += 1
+        audio = self._decode_to(audio_path, path)
+        self._evict(keep=path)
+        try:
+            return self.open(path)
+        except FileNotFoundError:
+            # 刚写入的文件已被其他请求的淘汰删除：直接使用解码结果
+            return audio
+
+    @staticmethod
+    def open(path):
+        """以只读 memmap 打开 PCM 文件（空文件返回空数组）"""
+        import numpy as np
+
+        if os.path.getsize(path) == 0:
+            return np.zeros(0, dtype=np.float32)
+        return np.memmap(path, dtype=np.float32, mode="r")
+
+    def _decode_to(self, audio_path, path):
+        """解码音频并写入 PCM 文件（先写临时文件再改名，避免并发读到半个文件），返回解码后的波形"""
+        from faster_whisper import decode_audio
+
+        audio = decode_audio(str(audio_path), sampling_rate=SAMPLE_RATE).astype("float32")
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        audio.tofile(tmp_path)
+        os.replace(tmp_path, path)
+        return audio
+
+    def _evict(self, keep=None):
+        """超出磁盘预算时删除最久未使用的 PCM 文件"""
+        with self._lock:
+            files = sorted(self.cache_dir.glob("*.f32"), key=lambda f: f.stat().st_mtime)
+            total = sum(f.stat().st_size for f in files)
+            for f in files:
+                if total <= self.max_bytes:
+                    break
+                if f == keep:
+                    continue
+                size = f.stat().st_size
+                # 已打开的 memmap 在 POSIX 上仍可继续读取，Windows 上删除失败则跳过
+                try:
+                    f.unlink()
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            files = list(self.cache_dir.glob("*.f32"))
+            return {
+                "entries": len(files),
+                "bytes": sum(f.stat().st_size for f in files),
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "cache_dir": str(self.cache_dir),
+            }
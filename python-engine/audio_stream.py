@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+流式音频解码模块 - 以固定大小的窗口解码并重采样，逐窗口送入 Whisper
+整文件解码时 4 小时录音需要数 GB 的 float32 采样；按窗口解码后，
+峰值内存只与窗口长度有关，与文件时长无关
+"""
+
+from parallel_transcribe import stitch_segments
+
+SAMPLE_RATE = 16000
+
+# 默认窗口长度与相邻窗口的重叠（秒）
+DEFAULT_WINDOW_SECONDS = 300
+DEFAULT_OVERLAP_SECONDS = 5
+
+
+def probe_duration(audio_path):
+    """
+    从容器元数据读取音频时长（不解码）
+
+    Returns:
+        时长（秒），元数据缺失时返回 None
+    """
+    import av
+
+    with av.open(str(audio_path), metadata_errors="ignore") as container:
+        if container.duration is not None:
+            return container.duration / av.time_base
+        stream = container.streams.audio[0]
+        if stream.duration is not None and stream.time_base is not None:
+            return float(stream.duration * stream.time_base)
+    return None
+
+
+def iter_pcm_blocks(audio_path, start_seconds=0.0):
+    """
+    逐帧解码并重采样为 16 kHz 单声道 float32
+
+    Args:
+        audio_path: 音频文件路径
+        start_seconds: 起始时间（秒）；大于 0 时先定位到该时间之前的关键帧，
+            再丢弃多解出的采样，不解码之前的内容
+
+    Yields:
+        一维 float32 数组（长度取决于容器帧大小）
+    """
+    import av
+
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+    with av.open(str(audio_path), metadata_errors="ignore") as container:
+        stream = container.streams.audio[0]
+        skip = 0
+        if start_seconds > 0:
+            container.seek(int(start_seconds * av.time_base))
+            skip = None
+
+        def trim(block):
+            nonlocal skip
+            if skip:
+                dropped = min(skip, len(block))
+                block = block[dropped:]
+                skip -= dropped
+            return block
+
+        for frame in container.decode(stream):
+            if skip is None:
+                # 定位落在关键帧上，按第一帧的时间戳计算需要丢弃的采样数
+                frame_time = frame.time if frame.time is not None else start_seconds
+                skip = max(0, int(round((start_seconds - frame_time) * SAMPLE_RATE)))
+            frame.pts = None
+            for out in resampler.resample(frame):
+                block = trim(out.to_ndarray().reshape(-1))
+                if len(block):
+                    yield block
+        # 冲刷重采样器内部缓冲
+        for out in resampler.resample(None):
+            block = trim(out.to_ndarray().reshape(-1))
+            if len(block):
+                yield block
+
+
+def decode_window(audio_path, start_seconds, seconds):
+    """
+    只解码 [start_seconds, start_seconds + seconds) 范围内的音频
+
+    Returns:
+        16 kHz float32 数组（超出文件末尾时长度不足 seconds）
+    """
+    import numpy as np
+
+    audio = np.empty(int(seconds * SAMPLE_RATE), dtype=np.float32)
+    filled = 0
+    for block in iter_pcm_blocks(audio_path, start_seconds):
+        take = min(len(audio) - filled, len(block))
+        audio[filled:filled + take] = block[:take]
+        filled += take
+        if filled == len(audio):
+            break
+    return audio[:filled]
+
+
+def iter_audio_windows(audio_path, window_seconds=DEFAULT_WINDOW_SECONDS,
+                       overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+    """
+    按固定窗口产出音频，相邻窗口重叠 overlap_seconds
+
+    Args:
+        audio_path: 音频文件路径
+        window_seconds: 窗口长度（秒）
+        overlap_seconds: 重叠长度（秒），必须小于窗口长度
+
+    Yields:
+        (窗口起始时间（秒）, float32 数组, 是否最后一个窗口)
+    """
+    import numpy as np
+
+    window = int(window_seconds * SAMPLE_RATE)
+    overlap = int(overlap_seconds * SAMPLE_RATE)
+    if not 0 <= overlap < window:
+        raise ValueError("重叠长度必须小于窗口长度")
+
+    buffer = np.empty(window, dtype=np.float32)
+    filled = 0
+    offset = 0
+    pending = None
+
+    for block in iter_pcm_blocks(audio_path):
+        while len(block):
+            take = min(window - filled, len(block))
+            buffer[filled:filled + take] = block[:take]
+            filled += take
+            block = block[take:]
+            if filled == window:
+                # 延迟一个窗口产出，以便标记最后一个窗口
+                if pending is not None:
+                    yield pending[0], pending[1], False
+                pending = (offset / SAMPLE_RATE, buffer.copy())
+                buffer[:overlap] = buffer[window - overlap:window]
+                filled = overlap
+                offset += window - overlap
+
+    if pending is not None:
+        if filled > overlap:
+            yield pending[0], pending[1], False
+            yield offset / SAMPLE_RATE, buffer[:filled].copy(), True
+        else:
+            yield pending[0], pending[1], True
+    elif filled:
+        yield 0.0, buffer[:filled].copy(), True
+
+
+class StreamingTranscription:
+    """按窗口流式解码并转录的长音频"""
+
+    def __init__(self, model, audio_path, options, window_seconds=DEFAULT_WINDOW_SECONDS,
+                 overlap_seconds=DEFAULT_OVERLAP_SECONDS):
+        """
+        初始化
+
+        Args:
+            model: WhisperModel 实例
+            audio_path: 音频文件路径
+            options: model.transcribe 的参数（language 为 None 时用第一个窗口检测并固定）
+            window_seconds: 窗口长度（秒）
+            overlap_seconds: 相邻窗口重叠（秒）
+        """
+        self.model = model
+        self.audio_path = audio_path
+        self.options = dict(options)
+        self.window_seconds = window_seconds
+        self.overlap_seconds = overlap_seconds
+
+        self.language = self.options.get("language")
+        self.language_probability = 1.0
+        self.duration = probe_duration(audio_path) or 0.0
+        self.duration_after_vad = 0.0
+
+    def segments(self):
+        """
+        逐段产出转录结果（时间为原音频中的绝对时间）
+
+        每个窗口只提交开始于非重叠区域的分段，落在重叠区域的分段留给下一个窗口，
+        两个窗口都产出的重复分段按时间与文本去重。
+
+        Yields:
+            分段 dict（start, end, text）
+        """
+        last = None
+        for offset, audio, is_last in iter_audio_windows(
+            self.audio_path, self.window_seconds, self.overlap_seconds
+        ):
+            segments, info = self.model.transcribe(audio, **self.options)
+            if self.options.get("language") is None:
+                # 第一个窗口检测的语言固定用于之后所有窗口
+                self.options["language"] = self.language = info.language
+                self.language_probability = info.language_probability
+
+            commit_until = offset + len(audio) / SAMPLE_RATE - (0 if is_last else self.overlap_seconds)
+            for segment in segments:
+                start = segment.start + offset
+                if start >= commit_until:
+                    break
+                current = {
+                    "start": round(start, 3),
+                    "end": round(segment.end + offset, 3),
+                    "text": segment.text.strip()
+                }
+                if last is not None and (
+                    current["end"] <= last["end"] or len(stitch_segments([[last], [current]])) == 1
+                ):
+                    continue
+                last = current
+                yield current
+
+            # 重叠区域只计入一次：每个窗口按非重叠部分累计 VAD 后时长
+            committed = commit_until - offset
+            after_vad = getattr(info, "duration_after_vad", None)
+            self.duration_after_vad += committed if after_vad is None else min(after_vad, committed)
+            self.duration = max(self.duration, offset + len(audio) / SAMPLE_RATE)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+流式解码内存基准测试
+生成一个多小时的合成 WAV 文件，分别用整文件解码与按窗口流式解码处理，
+在独立子进程中测量峰值 RSS：流式解码的峰值应与文件时长无关
+
+用法:
+    python benchmark_streaming_decode.py                 # 默认 1 小时和 4 小时
+    python benchmark_streaming_decode.py --hours 1 2 4
+    python benchmark_streaming_decode.py --model tiny    # 同时跑一遍流式转录
+"""
+
+import argparse
+import math
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+ENGINE_DIR = Path(__file__).resolve().parent
+
+# 合成音频采样率（与 16 kHz 不同，以便同时测到重采样路径）
+SOURCE_RATE = 22050
+
+
+def write_synthetic_wav(path, hours):
+    """分块写入合成音频（方波 + 静音交替），写入过程本身不占用大量内存"""
+    seconds = int(hours * 3600)
+    tone = struct.pack("<h", 3000) * 50 + struct.pack("<h", -3000) * 50
+    one_second_tone = (tone * (SOURCE_RATE // 100 + 1))[:SOURCE_RATE * 2]
+    one_second_silence = b"\x00\x00" * SOURCE_RATE
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SOURCE_RATE)
+        for second in range(seconds):
+            f.writeframes(one_second_tone if second % 4 else one_second_silence)
+
+
+def peak_rss_mb():
+    """
+    当前进程的峰值 RSS（MB）
+
+    resource 模块只在 Unix 上可用；Windows 上改用 psutil 的峰值工作集，
+    两者都不可用时返回 NaN。
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return math.nan
+        info = psutil.Process().memory_info()
+        # peak_wset 仅 Windows 提供；其他平台退回当前 RSS
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(mode, path, model=None):
+    """在子进程中执行一种解码方式，返回 (峰值 RSS MB, 耗时秒)"""
+    args = [sys.executable, __file__, "--child", mode, str(path)]
+    if model:
+        args += ["--model", model]
+    output = subprocess.run(args, cwd=ENGINE_DIR, capture_output=True, text=True, check=True)
+    rss, elapsed = output.stdout.strip().splitlines()[-1].split()
+    return float(rss), float(elapsed)
+
+
+def child(mode, path, model=None):
+    """子进程入口"""
+    start = time.time()
+    if mode == "full":
+        from faster_whisper import decode_audio
+
+        audio = decode_audio(path, sampling_rate=16000)
+        del audio
+    elif mode == "stream":
+        from audio_stream import iter_audio_windows
+
+        for _ in iter_audio_windows(path):
+            pass
+    elif mode == "stream-transcribe":
+        from faster_whisper import WhisperModel
+        from audio_stream import StreamingTranscription
+
+        whisper = WhisperModel(model, device="cpu", compute_type="int8")
+        stream = StreamingTranscription(whisper, path, {"language": "en", "vad_filter": True})
+        for _ in stream.segments():
+            pass
+    print(f"{peak_rss_mb():.1f} {time.time() - start:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流式解码内存基准测试")
+    parser.add_argument("--hours", type=float, nargs="+", default=[1, 4])
+    parser.add_argument("--model", default=None, help="同时测试流式转录（如 tiny）")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.model)
+        return
+
+    print("=" * 60)
+    print("流式解码内存基准测试")
+    print("=" * 60)
+    print()
+
+    modes = ["full", "stream"] + (["stream-transcribe"] if args.model else [])
+    with tempfile.TemporaryDirectory(prefix="quicktrans-bench-") as tmp:
+        for hours in args.hours:
+            path = Path(tmp) / f"synthetic-{hours}h.wav"
+            print(f"生成 {hours} 小时合成音频...")
+            write_synthetic_wav(path, hours)
+            print(f"  文件大小: {os.path.getsize(path) / 1024 / 1024:.0f} MB")
+            for mode in modes:
+                rss, elapsed = run_child(mode, path, args.model)
+                rss_text = "     不可用" if math.isnan(rss) else f"{rss:8.1f} MB"
+                print(f"  {mode:18s} 峰值 RSS {rss_text}   耗时 {elapsed:7.1f} s")
+            path.unlink()
+            print()
+
+    print("预期：full 的峰值 RSS 随时长线性增长，stream 基本保持不变")
+
+
+if __name__ == "__main__":
+    main()
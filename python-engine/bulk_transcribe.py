@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+批量转录模块 - 转录整个目录（或 glob 匹配）下的所有音频文件
+先从容器元数据读取每个文件的时长（不解码），按时长从长到短分配给常驻 Whisper 工作进程，
+使最长的文件最先开始、总耗时最短；每完成一个文件就向 JSONL 追加一行结果，
+文件大小、修改时间与转录参数都未变化的文件在重新运行时直接跳过
+
+用法:
+    python bulk_transcribe.py /data/recordings --output results.jsonl --workers 4
+    python bulk_transcribe.py "/data/recordings/**/*.mp3" --output results.jsonl --model small
+"""
+
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from audio_stream import probe_duration
+import parallel_transcribe
+
+# 目录模式下收集的音频扩展名
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".flac", ".ogg", ".opus", ".aac", ".wma", ".webm", ".mp4"}
+
+# 并行读取容器元数据的线程数
+PROBE_THREADS = 8
+
+
+def find_audio_files(target, recursive=True):
+    """
+    查找要转录的音频文件
+
+    Args:
+        target: 目录路径，或 glob 模式（如 /data/**/*.mp3）
+        recursive: 目录模式下是否包含子目录
+
+    Returns:
+        排序后的绝对路径列表
+    """
+    path = Path(target)
+    if path.is_dir():
+        candidates = path.rglob("*") if recursive else path.glob("*")
+        files = [p for p in candidates if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS]
+    else:
+        files = [Path(p) for p in glob.glob(str(target), recursive=True) if os.path.isfile(p)]
+    return sorted(str(p.resolve()) for p in files)
+
+
+def load_results(output_path):
+    """
+    读取已有的 JSONL 结果（同一文件有多行时以最后一行为准）
+
+    Returns:
+        {文件路径: 结果记录}
+    """
+    results = {}
+    if not os.path.exists(output_path):
+        return results
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 上次运行中断时可能留下不完整的最后一行
+                continue
+            results[record.get("path")] = record
+    return results
+
+
+def is_up_to_date(record, st, params):
+    """已有结果是否对应当前的文件内容与转录参数"""
+    return (
+        record is not None
+        and record.get("status") == "ok"
+        and record.get("size") == st.st_size
+        and record.get("mtime_ns") == st.st_mtime_ns
+        and record.get("params") == params
+    )
+
+
+def plan(files, previous, params):
+    """
+    生成转录计划：跳过已是最新的文件，其余按时长从长到短排序
+
+    Args:
+        files: 文件路径列表
+        previous: load_results 返回的已有结果
+        params: 转录参数（写入每条结果，用于判断结果是否过期）
+
+    Returns:
+        (待转录的 [(路径, 时长, os.stat 结果)], 跳过的文件数)
+    """
+    pending = []
+    skipped = 0
+    for path in files:
+        st = os.stat(path)
+        if is_up_to_date(previous.get(path), st, params):
+            skipped += 1
+        else:
+            pending.append((path, st))
+
+    def probe(path):
+        try:
+            return probe_duration(path)
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=PROBE_THREADS) as pool:
+        durations = list(pool.map(probe, [path for path, _ in pending]))
+
+    # 最长处理时间优先：时长未知的文件排在最后
+    todo = [(path, duration, st) for (path, st), duration in zip(pending, durations)]
+    todo.sort(key=lambda item: -1 if item[1] is None else item[1], reverse=True)
+    return todo, skipped
+
+
+def transcribe_bulk(target, output_path, options, model_size, compute_type, workers,
+                    recursive=True, progress_callback=None):
+    """
+    批量转录
+
+    Args:
+        target: 目录路径或 glob 模式
+        output_path: JSONL 结果文件（追加写入）
+        options: model.transcribe 的参数
+        model_size: 模型大小
+        compute_type: 计算类型
+        workers: Whisper 工作进程数
+        recursive: 目录模式下是否包含子目录
+        progress_callback: 每完成一个文件调用一次，参数为进度（0-1）；
+            回调抛出异常（如任务取消）时取消尚未开始的文件，已写入的结果保留
+
+    Returns:
+        dict: 文件数、跳过数、成功/失败数、音频总时长、耗时
+
+    Raises:
+        parallel_transcribe.PoolBusy: 常驻进程池正被参数不同的任务占用
+    """
+    start_time = time.time()
+    params = {"model_size": model_size, "compute_type": compute_type, "options": options}
+
+    files = find_audio_files(target, recursive)
+    todo, skipped = plan(files, load_results(output_path), params)
+    print(f"[BULK] 共 {len(files)} 个文件，跳过 {skipped} 个已是最新的结果，待转录 {len(todo)} 个")
+
+    succeeded = 0
+    failed = 0
+    audio_seconds = 0.0
+    # 没有待转录的文件时不启动工作进程
+    if todo:
+        Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        with parallel_transcribe.lease_pool(model_size, compute_type, workers) as pool, \
+                open(output_path, "a", encoding="utf-8") as out:
+            futures = {
+                parallel_transcribe.submit_file(pool, path, options): (path, st)
+                for path, _, st in todo
+            }
+            try:
+                for done, future in enumerate(as_completed(futures), start=1):
+                    path, st = futures[future]
+                    record = {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "params": params}
+                    try:
+                        result = future.result()
+                        record.update(status="ok", **result)
+                        succeeded += 1
+                        audio_seconds += result["duration"]
+                    except Exception as e:
+                        record.update(status="error", error=str(e))
+                        failed += 1
+                        print(f"[BULK] 转录失败: {path}: {e}")
+
+                    # 每个文件完成后立即落盘，中断后重新运行只需处理剩余文件
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    if progress_callback is not None:
+                        progress_callback(done / len(futures))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+    wall_time = time.time() - start_time
+    return {
+        "files": len(files),
+        "skipped": skipped,
+        "succeeded": succeeded,
+        "failed": failed,
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_time": round(wall_time, 3),
+        "output_path": str(output_path),
+    }
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="批量转录目录中的音频文件")
+    parser.add_argument("target", help="目录路径或 glob 模式")
+    parser.add_argument("--output", required=True, help="JSONL 结果文件")
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 1) // 4))
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--compute-type", default="int8")
+    parser.add_argument("--language", default="auto")
+    parser.add_argument("--task", default="transcribe")
+    parser.add_argument("--vad-filter", action="store_true")
+    parser.add_argument("--no-recursive", action="store_true")
+    args = parser.parse_args()
+
+    options = {"language": None if args.language == "auto" else args.language, "task": args.task}
+    if args.vad_filter:
+        options["vad_filter"] = True
+
+    def progress(value):
+        print(f"[BULK] 进度 {value * 100:.1f}%")
+
+    try:
+        summary = transcribe_bulk(
+            args.target,
+            args.output,
+            options,
+            args.model,
+            args.compute_type,
+            args.workers,
+            recursive=not args.no_recursive,
+            progress_callback=progress
+        )
+    finally:
+        parallel_transcribe.shutdown_pools()
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+异步任务模块 - 有界线程池执行长时间任务
+提交后立即返回任务 ID，客户端轮询状态、进度与结果，支持取消
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+
+
+class JobCancelled(Exception):
+    """任务已被取消（由 Job.report 在检查点抛出）"""
+
+
+class Job:
+    """一个异步任务"""
+
+    def __init__(self, kind, params):
+        """
+        初始化任务
+
+        Args:
+            kind: 任务类型（如 "transcribe"）
+            params: 任务参数（用于展示）
+        """
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = QUEUED
+        self.progress = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        """是否已请求取消"""
+        return self._cancel.is_set()
+
+    def report(self, progress):
+        """
+        更新进度（任务函数在每个检查点调用）
+
+        Args:
+            progress: 进度（0-1）
+
+        Raises:
+            JobCancelled: 任务已被取消，任务函数应立即停止
+        """
+        if self._cancel.is_set():
+            raise JobCancelled()
+        self.progress = max(0.0, min(1.0, progress))
+
+    def to_dict(self):
+        """任务状态（不含结果）"""
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "params": self.params,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """任务管理器 - 有界线程池 + 任务登记表"""
+
+    def __init__(self, max_workers=1, max_finished=200):
+        """
+        初始化任务管理器
+
+        Args:
+            max_workers: 同时执行的任务数
+            max_finished: 最多保留的已结束任务数（超出后删除最早结束的）
+        """
+        self.max_finished = max(1, int(max_finished))
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)),
+            thread_name_prefix="job-worker"
+        )
+        self._lock = threading.Lock()
+        self._jobs = {}
+
+    def submit(self, kind, params, fn):
+        """
+        提交任务
+
+        Args:
+            kind: 任务类型
+            params: 任务参数（用于展示）
+            fn: 任务函数，签名为 fn(job)，返回值作为任务结果
+
+        Returns:
+            Job 实例
+        """
+        job = Job(kind, params)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job, fn):
+        """在工作线程中执行任务"""
+        if job.cancelled:
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.progress = 1.0
+            job.status = COMPLETED
+        except JobCancelled:
+            job.status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id):
+        """返回任务（不存在时返回 None）"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self):
+        """返回所有任务（按创建时间排序）"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at)
+
+    def cancel(self, job_id):
+        """
+        取消任务
+
+        排队中的任务直接取消；运行中的任务在下一个检查点停止。
+
+        Returns:
+            Job 实例（不存在时返回 None）
+        """
+        job = self.get(job_id)
+        if job is None or job.status in FINISHED_STATES:
+            return job
+        job._cancel.set()
+        if job.future is not None and job.future.cancel():
+            job.status = CANCELLED
+            job.finished_at = time.time()
+        return job
+
+    def _prune(self):
+        """删除最早结束的任务，使已结束任务数不超过上限（调用方需持有锁）"""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.status in FINISHED_STATES),
+            key=lambda job: job.finished_at or 0
+        )
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job.id]
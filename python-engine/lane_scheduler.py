@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+优先级通道调度模块 - 交互通道（界面上的翻译、语言检测、实时转录）与批量通道（文件转录、批量任务）分开调度
+每个通道有独立的线程池与并发上限（可选地划分 CPU 线程）；批量任务在每个分段解码完成后检查一次，
+交互通道有请求在执行或排队时暂停，等交互请求完成后继续，长转录不再拖慢界面请求
+"""
+
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+# 每个通道保留最近多少次执行的耗时，用于计算延迟分位数
+LATENCY_WINDOW = 1000
+
+
+class Lane:
+    """一个调度通道"""
+
+    def __init__(self, name, concurrency, threads):
+        """
+        Args:
+            name: 通道名称
+            concurrency: 同时执行的任务数上限
+            threads: 预留给该通道的 CPU 线程数（0 表示不划分）
+        """
+        self.name = name
+        self.concurrency = max(1, int(concurrency))
+        self.threads = max(0, int(threads))
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"lane-{name}")
+
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def threads_per_task(self):
+        """每个任务可用的 CPU 线程数（通道预留线程按并发上限平分；0 表示不限制）"""
+        if not self.threads:
+            return 0
+        return max(1, self.threads // self.concurrency)
+
+    def percentile(self, q):
+        """最近执行耗时（含排队）的分位数（秒）"""
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class LaneScheduler:
+    """交互 / 批量两通道调度器"""
+
+    def __init__(self, interactive_concurrency=8, bulk_concurrency=2, interactive_threads=None,
+                 total_threads=None):
+        """
+        初始化调度器
+
+        Args:
+            interactive_concurrency: 交互通道并发上限
+            bulk_concurrency: 批量通道并发上限
+            interactive_threads: 预留给交互通道的 CPU 线程数，其余归批量通道
+                （默认不划分：空闲时单个任务可以使用全部核心，通道间只按并发上限与抢占点调度）
+            total_threads: 总 CPU 线程数（默认 os.cpu_count()）
+        """
+        if interactive_threads:
+            total_threads = max(2, total_threads or os.cpu_count() or 2)
+            interactive_threads = min(max(1, interactive_threads), total_threads - 1)
+            bulk_threads = total_threads - interactive_threads
+        else:
+            interactive_threads = bulk_threads = 0
+
+        self.lanes = {
+            INTERACTIVE: Lane(INTERACTIVE, interactive_concurrency, interactive_threads),
+            BULK: Lane(BULK, bulk_concurrency, bulk_threads),
+        }
+        self._cond = threading.Condition()
+
+        self.preemptions = 0
+        self.paused_seconds = 0.0
+
+    def threads_per_task(self, lane):
+        """指定通道每个任务可用的 CPU 线程数"""
+        return self.lanes[lane].threads_per_task
+
+    @contextmanager
+    def slot(self, lane):
+        """
+        占用通道的一个并发名额（名额已满时等待）
+
+        Args:
+            lane: INTERACTIVE 或 BULK
+        """
+        lane = self.lanes[lane]
+        start = time.time()
+        with self._cond:
+            lane.waiting += 1
+            while lane.active >= lane.concurrency:
+                self._cond.wait()
+            lane.waiting -= 1
+            lane.active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                lane.active -= 1
+                lane.completed += 1
+                lane.latencies.append(time.time() - start)
+                self._cond.notify_all()
+
+    def call(self, lane, fn, *args, **kwargs):
+        """在当前线程中占用通道名额执行 fn（用于已有独立线程的调用方，如后台任务）"""
+        with self.slot(lane):
+            return fn(*args, **kwargs)
+
+    async def run(self, lane, fn, *args, **kwargs):
+        """
+        在通道自己的线程池中执行 fn
+
+        异步接口通过该方法执行阻塞任务，不占用 uvicorn 的默认线程池，
+        批量任务再多也不会让交互请求等不到线程。
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.lanes[lane].executor,
+            functools.partial(self.call, lane, fn, *args, **kwargs)
+        )
+
+    def checkpoint(self):
+        """
+        批量任务的抢占点（在分段边界调用）
+
+        交互通道有任务在执行或排队时阻塞，直到交互通道空闲。
+        """
+        interactive = self.lanes[INTERACTIVE]
+        with self._cond:
+            if not (interactive.active or interactive.waiting):
+                return
+            self.preemptions += 1
+            start = time.time()
+            while interactive.active or interactive.waiting:
+                self._cond.wait()
+            self.paused_seconds += time.time() - start
+
+    def stats(self):
+        """返回各通道的并发、排队与延迟统计"""
+        with self._cond:
+            return {
+                "lanes": {
+                    name: {
+                        "concurrency": lane.concurrency,
+                        "threads": lane.threads,
+                        "threads_per_task": lane.threads_per_task,
+                        "active": lane.active,
+                        "waiting": lane.waiting,
+                        "completed": lane.completed,
+                        "p50_seconds": round(lane.percentile(0.5), 4),
+                        "p99_seconds": round(lane.percentile(0.99), 4),
+                    }
+                    for name, lane in self.lanes.items()
+                },
+                "preemptions": self.preemptions,
+                "paused_seconds": round(self.paused_seconds, 3),
+            }
+
+    def shutdown(self):
+        """关闭各通道的线程池"""
+        for lane in self.lanes.values():
+            lane.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+语言检测模块 - 只解码少量音频窗口并运行 Whisper 语言检测
+完整转录时语言只是副产品；路由只需要语言时，解码开头 N 秒或均匀抽取的几个窗口即可，
+耗时与音频总时长无关
+"""
+
+from audio_stream import SAMPLE_RATE, decode_window, probe_duration
+
+# Whisper 一次编码的音频长度（秒），检测窗口不超过该长度
+MAX_WINDOW_SECONDS = 30
+
+
+def sample_offsets(duration, windows, window_seconds):
+    """
+    计算检测窗口的起始时间
+
+    一个窗口时取音频开头；多个窗口时在全长上均匀取各窗口中心，
+    避免只看开头时被片头静音或音乐误导。
+
+    Args:
+        duration: 音频时长（秒），未知时为 None
+        windows: 窗口数
+        window_seconds: 每个窗口的长度（秒）
+
+    Returns:
+        起始时间（秒）列表
+    """
+    if windows <= 1 or not duration or duration <= window_seconds:
+        return [0.0]
+    windows = min(windows, int(duration // window_seconds))
+    return [
+        max(0.0, min(duration - window_seconds, duration * (i + 0.5) / windows - window_seconds / 2))
+        for i in range(windows)
+    ]
+
+
+def detect_language(model, audio_path, windows=1, window_seconds=MAX_WINDOW_SECONDS, top_k=5):
+    """
+    检测音频的语言
+
+    Args:
+        model: WhisperModel 实例
+        audio_path: 音频文件路径
+        windows: 抽取的窗口数（1 表示只看开头）
+        window_seconds: 每个窗口的长度（秒，不超过 30）
+        top_k: 返回概率最高的前几种语言
+
+    Returns:
+        dict: language, language_probability, top_languages, windows, analyzed_seconds, duration
+    """
+    window_seconds = min(window_seconds, MAX_WINDOW_SECONDS)
+    duration = probe_duration(audio_path)
+
+    # 各窗口的语言概率取平均
+    totals = {}
+    analyzed = 0
+    analyzed_seconds = 0.0
+    for offset in sample_offsets(duration, windows, window_seconds):
+        audio = decode_window(audio_path, offset, window_seconds)
+        if len(audio) == 0:
+            continue
+        _, _, all_probabilities = model.detect_language(audio)
+        for language, probability in all_probabilities:
+            totals[language] = totals.get(language, 0.0) + probability
+        analyzed += 1
+        analyzed_seconds += len(audio) / SAMPLE_RATE
+
+    if not analyzed:
+        raise ValueError("音频为空，无法检测语言")
+
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    top_languages = [
+        {"language": language, "probability": round(total / analyzed, 4)}
+        for language, total in ranked[:max(1, top_k)]
+    ]
+    return {
+        "language": top_languages[0]["language"],
+        "language_probability": top_languages[0]["probability"],
+        "top_languages": top_languages,
+        "windows": analyzed,
+        "analyzed_seconds": round(analyzed_seconds, 3),
+        "duration": duration,
+    }
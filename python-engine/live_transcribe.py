@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+实时转录模块 - 对不断到达的麦克风 PCM 做滚动窗口 Whisper 解码
+每次解码整个未确认的缓冲区，相邻两次解码结果的公共前缀（local agreement）视为确定，
+作为最终分段输出，其余部分作为临时结果；已确定的音频从缓冲区头部裁掉，
+缓冲区长度有上限，会话持续多久内存都不会增长
+"""
+
+import re
+import threading
+
+SAMPLE_RATE = 16000
+
+# 支持的 PCM 采样格式
+PCM_FORMATS = ["s16le", "f32le"]
+
+# 已确定文本中作为下一次解码提示词保留的字符数
+PROMPT_CHARS = 200
+
+# 与已确定文本比较、去除重复的最大词数
+DEDUPE_WORDS = 5
+
+
+def pcm_to_float(data, sample_format="s16le", sample_rate=SAMPLE_RATE):
+    """
+    将一帧 PCM 字节转换为 16 kHz float32
+
+    Args:
+        data: PCM 字节（单声道，小端）
+        sample_format: s16le（16 位整数）或 f32le（32 位浮点）
+        sample_rate: 输入采样率；不是 16 kHz 时线性插值重采样
+
+    Returns:
+        一维 float32 数组
+    """
+    import numpy as np
+
+    if sample_format == "s16le":
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    elif sample_format == "f32le":
+        samples = np.frombuffer(data, dtype="<f4").astype(np.float32)
+    else:
+        raise ValueError(f"不支持的采样格式: {sample_format}")
+
+    if sample_rate != SAMPLE_RATE and len(samples):
+        target = int(round(len(samples) * SAMPLE_RATE / sample_rate))
+        positions = np.arange(target) * (sample_rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+    return samples
+
+
+def _normalize(word):
+    """去除标点与空白后比较词"""
+    return re.sub(r"[\W_]+", "", word.lower())
+
+
+class LiveTranscriber:
+    """单个实时转录会话（音频由接收线程写入，解码由处理线程执行）"""
+
+    def __init__(self, model, language=None, task="transcribe", min_chunk_seconds=1.0,
+                 max_buffer_seconds=20.0):
+        """
+        初始化会话
+
+        Args:
+            model: WhisperModel 实例
+            language: 语言代码（None 表示由前几次解码检测后固定）
+            task: transcribe 或 translate
+            min_chunk_seconds: 两次解码之间至少新到达的音频长度（秒）
+            max_buffer_seconds: 未确认缓冲区的最大长度（秒）；超过时强制确定临时结果
+        """
+        import numpy as np
+
+        self.model = model
+        self.language = language
+        self.language_probability = 1.0 if language else 0.0
+        self.task = task
+        self.min_chunk_seconds = min_chunk_seconds
+        self.max_buffer_seconds = max_buffer_seconds
+
+        self._lock = threading.Lock()
+        self._audio = np.zeros(0, dtype=np.float32)
+        # 缓冲区第一个采样在会话中的绝对时间（秒）
+        self._offset = 0.0
+        self._new_samples = 0
+
+        # 上一次解码中尚未确定的词：[(start, end, word)]
+        self._hypothesis = []
+        self._committed_end = 0.0
+        self._committed_words = []
+        self._prompt = ""
+        self._detected = None
+
+        self.received_seconds = 0.0
+        self.dropped_seconds = 0.0
+        self.decodes = 0
+
+    @property
+    def ready(self):
+        """新到达的音频是否足够进行下一次解码"""
+        with self._lock:
+            return self._new_samples >= self.min_chunk_seconds * SAMPLE_RATE
+
+    @property
+    def buffer_seconds(self):
+        """当前缓冲区长度（秒）"""
+        with self._lock:
+            return len(self._audio) / SAMPLE_RATE
+
+    def insert_audio(self, samples):
+        """
+        追加一段 16 kHz float32 音频
+
+        解码跟不上实时速度时，缓冲区超过上限的两倍后丢弃最旧的音频，保证内存有界。
+        """
+        import numpy as np
+
+        with self._lock:
+            self._audio = np.concatenate([self._audio, samples])
+            self._new_samples += len(samples)
+            self.received_seconds += len(samples) / SAMPLE_RATE
+
+            limit = int(2 * self.max_buffer_seconds * SAMPLE_RATE)
+            if len(self._audio) > limit:
+                dropped = len(self._audio) - limit
+                self._audio = self._audio[dropped:]
+                self._offset += dropped / SAMPLE_RATE
+                self.dropped_seconds += dropped / SAMPLE_RATE
+                self._committed_end = max(self._committed_end, self._offset)
+                self._hypothesis = [w for w in self._hypothesis if w[0] >= self._offset]
+
+    def process(self):
+        """
+        解码当前缓冲区
+
+        Returns:
+            (最终分段 dict 或 None, 临时分段 dict 或 None)
+        """
+        with self._lock:
+            audio = self._audio.copy()
+            offset = self._offset
+            language = self.language
+            prompt = self._prompt
+            self._new_samples = 0
+
+        # 解码期间不持有锁，接收线程可以继续追加音频
+        words = self._transcribe(audio, offset, language, prompt)
+
+        with self._lock:
+            words = self._drop_committed(words)
+
+            # 公共前缀：两次解码一致的词视为确定
+            agreed = 0
+            while (agreed < len(words) and agreed < len(self._hypothesis)
+                   and _normalize(words[agreed][2]) == _normalize(self._hypothesis[agreed][2])):
+                agreed += 1
+            committed = words[:agreed]
+            self._hypothesis = words[agreed:]
+
+            # 缓冲区过长仍未达成一致（如持续说话没有停顿）：强制确定全部临时结果
+            if len(audio) / SAMPLE_RATE > self.max_buffer_seconds:
+                committed += self._hypothesis
+                self._hypothesis = []
+
+            final = self._commit(committed)
+            if final is not None:
+                self._trim()
+            return final, self._partial()
+
+    def finish(self):
+        """
+        会话结束：解码剩余音频并确定所有临时结果
+
+        Returns:
+            最终分段 dict 或 None
+        """
+        with self._lock:
+            has_new = self._new_samples > 0
+            audio = self._audio.copy()
+            offset = self._offset
+            language = self.language
+            prompt = self._prompt
+
+        words = self._transcribe(audio, offset, language, prompt) if has_new else None
+
+        with self._lock:
+            words = self._hypothesis if words is None else self._drop_committed(words)
+            self._hypothesis = []
+            return self._commit(words)
+
+    def _transcribe(self, audio, offset, language, prompt):
+        """解码一次，返回词列表（绝对时间；不访问与接收线程共享的状态）"""
+        if len(audio) == 0:
+            return []
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            task=self.task,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=prompt or None,
+            vad_filter=True,
+            vad_parameters={"min_silence_duration_ms": 500}
+        )
+        words = [
+            (word.start + offset, word.end + offset, word.word)
+            for segment in segments
+            for word in (segment.words or [])
+        ]
+        self.decodes += 1
+        if language is None:
+            self._detected = (info.language, info.language_probability)
+        return words
+
+    def _drop_committed(self, words):
+        """
+        丢弃落在已确定区域内或已被丢弃的音频中的词，以及与已确定文本末尾重复的开头几个词
+
+        调用方需持有锁（解码期间接收线程可能因缓冲区溢出丢弃了音频）。
+        """
+        words = [w for w in words if w[0] >= max(self._committed_end - 0.1, self._offset)]
+        tail = [_normalize(w[2]) for w in self._committed_words]
+        for n in range(min(DEDUPE_WORDS, len(tail), len(words)), 0, -1):
+            if tail[-n:] == [_normalize(w[2]) for w in words[:n]]:
+                words = words[n:]
+                break
+        return words
+
+    def _commit(self, words):
+        """把一组词确定为最终分段（调用方需持有锁）"""
+        words = [w for w in words if w[2].strip()]
+        if not words:
+            return None
+        if self.language is None and self._detected is not None:
+            # 第一次确定文本时固定语言，之后的解码不再重复检测
+            self.language, self.language_probability = self._detected
+
+        self._committed_end = words[-1][1]
+        self._committed_words = (self._committed_words + words)[-DEDUPE_WORDS:]
+        text = "".join(w[2] for w in words).strip()
+        self._prompt = (self._prompt + " " + text)[-PROMPT_CHARS:]
+        return {"start": round(words[0][0], 3), "end": round(words[-1][1], 3), "text": text}
+
+    def _partial(self):
+        """当前临时结果（调用方需持有锁）"""
+        if not self._hypothesis:
+            return None
+        return {
+            "start": round(self._hypothesis[0][0], 3),
+            "end": round(self._hypothesis[-1][1], 3),
+            "text": "".join(w[2] for w in self._hypothesis).strip()
+        }
+
+    def _trim(self):
+        """从缓冲区头部裁掉已确定的音频（调用方需持有锁）"""
+        cut = int((self._committed_end - self._offset) * SAMPLE_RATE)
+        if cut > 0:
+            self._audio = self._audio[cut:]
+            self._offset += cut / SAMPLE_RATE
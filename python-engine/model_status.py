@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+模型状态模块 - 记录每个模型的加载状态
+状态：cold（未加载）、loading（加载中）、warm（已加载可用）、failed（加载失败）
+"""
+
+import threading
+import time
+
+COLD = "cold"
+LOADING = "loading"
+WARM = "warm"
+FAILED = "failed"
+
+
+class ModelStatusRegistry:
+    """模型状态登记表（线程安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def set(self, name, state, error=None):
+        """
+        更新模型状态
+
+        Args:
+            name: 模型名称（如 "whisper"、"translator:zh-en"）
+            state: cold / loading / warm / failed
+            error: 失败原因（可选）
+        """
+        with self._lock:
+            entry = self._models.setdefault(name, {"state": COLD})
+            now = time.time()
+            if state == LOADING:
+                entry["loading_since"] = now
+            elif state == WARM and "loading_since" in entry:
+                entry["load_seconds"] = round(now - entry["loading_since"], 2)
+            entry["state"] = state
+            entry["updated_at"] = now
+            entry["error"] = error
+
+    def get(self, name):
+        """返回模型状态（未登记的模型为 cold）"""
+        with self._lock:
+            return self._models.get(name, {"state": COLD})["state"]
+
+    def snapshot(self):
+        """返回所有模型状态的副本"""
+        with self._lock:
+            return {name: dict(entry) for name, entry in self._models.items()}
+
+
+# 全局模型状态登记表
+model_status = ModelStatusRegistry()
@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+多进程并行转录模块 - 长音频在静音处切成 N 段，由常驻的 Whisper 工作进程并行转录
+单个 WhisperModel 调用只使用一个 CTranslate2 实例，多核服务器上大部分核心空闲；
+切段后每个工作进程各持有一个模型并分得一部分 CPU 线程，最后按时间偏移拼接结果
+"""
+
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+SAMPLE_RATE = 16000
+
+# 切分点允许偏离理想位置的范围（占每段长度的比例）
+SPLIT_SEARCH_RATIO = 0.25
+
+# 工作进程内的模型（由进程初始化函数加载，进程存活期间保持常驻）
+_worker_model = None
+
+# 常驻进程池（同一时刻只保留一个；每个工作进程各持有一个模型）
+_pool = None
+_pool_key = None
+_pool_users = 0
+_pool_idle_since = 0.0
+_pool_cond = threading.Condition()
+
+# 进程池启动与关闭时的回调（参数为常驻的进程池数 0 或 1；进程池作为一个模型变体计入常驻上限）
+_pool_listener = None
+
+# 所有工作进程合计可用的 CPU 线程数（由 set_cpu_budget 调整，为交互请求预留核心）
+_cpu_budget = os.cpu_count() or 1
+
+
+class PoolBusy(Exception):
+    """常驻进程池正被参数不同的任务占用"""
+
+
+def set_cpu_budget(threads):
+    """设置工作进程合计可用的 CPU 线程数（只影响之后新建的进程池）"""
+    global _cpu_budget
+    _cpu_budget = max(1, int(threads))
+
+
+def set_pool_listener(listener):
+    """设置进程池启动与关闭时的回调（如 WhisperModelRegistry.set_external）"""
+    global _pool_listener
+    _pool_listener = listener
+
+
+def _init_worker(model_size, compute_type, cpu_threads):
+    """工作进程初始化：加载一次模型，后续任务复用"""
+    global _worker_model
+    from faster_whisper import WhisperModel
+
+    _worker_model = WhisperModel(
+        model_size,
+        device="cpu",
+        compute_type=compute_type,
+        cpu_threads=cpu_threads
+    )
+
+
+def _detect_language(slice_path):
+    """在工作进程中检测语言"""
+    import numpy as np
+
+    audio = np.load(slice_path, mmap_mode="r")
+    language, probability, _ = _worker_model.detect_language(np.asarray(audio))
+    return language, probability
+
+
+def _transcribe_slice(slice_path, offset, options):
+    """
+    在工作进程中转录一段音频
+
+    Args:
+        slice_path: 音频段 .npy 文件路径（16 kHz float32）
+        offset: 该段在原音频中的起始时间（秒）
+        options: model.transcribe 的参数
+
+    Returns:
+        时间已加上偏移的分段列表，以及 VAD 后的有效时长
+    """
+    import numpy as np
+
+    audio = np.load(slice_path, mmap_mode="r")
+    segments, info = _worker_model.transcribe(np.asarray(audio), **options)
+    result = [
+        {
+            "start": round(segment.start + offset, 3),
+            "end": round(segment.end + offset, 3),
+            "text": segment.text.strip()
+        }
+        for segment in segments
+    ]
+    after_vad = getattr(info, "duration_after_vad", None)
+    return result, info.duration if after_vad is None else after_vad
+
+
+def _transcribe_file(audio_path, options):
+    """
+    在工作进程中转录一个完整的音频文件（批量转录使用）
+
+    Returns:
+        dict: text, segments, language, language_probability, duration, skipped_seconds, processing_time
+    """
+    start_time = time.time()
+    segments, info = _worker_model.transcribe(audio_path, **options)
+    result = [
+        {"start": round(segment.start, 3), "end": round(segment.end, 3), "text": segment.text.strip()}
+        for segment in segments
+    ]
+    after_vad = getattr(info, "duration_after_vad", None)
+    return {
+        "text": " ".join(segment["text"] for segment in result),
+        "segments": result,
+        "language": info.language,
+        "language_probability": info.language_probability,
+        "duration": info.duration,
+        "skipped_seconds": 0.0 if after_vad is None else max(0.0, info.duration - after_vad),
+        "processing_time": time.time() - start_time,
+    }
+
+
+def submit_file(pool, audio_path, options):
+    """
+    把一个完整文件的转录提交给常驻工作进程池
+
+    Args:
+        pool: lease_pool 返回的进程池
+        audio_path: 音频文件路径
+        options: model.transcribe 的参数
+
+    Returns:
+        concurrent.futures.Future，结果格式见 _transcribe_file
+    """
+    return pool.submit(_transcribe_file, str(audio_path), options)
+
+
+@contextmanager
+def lease_pool(model_size, compute_type, workers):
+    """
+    占用常驻工作进程池
+
+    同一时刻只保留一个进程池，每个进程分得 CPU 线程预算 / workers 个 CPU 线程；
+    请求的参数与现有进程池不同时，现有进程池空闲则关闭它再新建，仍有任务则立即失败
+    （批量任务可能占用进程池数小时，不能让请求一直等待），常驻的模型副本数不会随请求参数的组合增长。
+    使用 spawn 启动，避免在已有多线程的服务进程中 fork。
+
+    Yields:
+        ProcessPoolExecutor
+
+    Raises:
+        PoolBusy: 现有进程池参数不同且仍有任务
+    """
+    global _pool, _pool_key, _pool_users, _pool_idle_since
+
+    key = (model_size, compute_type, workers)
+    with _pool_cond:
+        if _is_broken(_pool):
+            # 工作进程异常退出（如长文件内存不足被杀）后进程池不可再用，换一个新的
+            print("[PARALLEL] 进程池已损坏，重新启动工作进程")
+            _close_pool()
+        if _pool is not None and _pool_key != key and _pool_users:
+            raise PoolBusy(f"多进程转录进程池正被其他任务使用（{_pool_key[0]}, {_pool_key[1]}, {_pool_key[2]} 进程）")
+        if _pool_key != key:
+            _close_pool()
+            cpu_threads = max(1, _cpu_budget // workers)
+            print(f"[PARALLEL] 启动 {workers} 个 Whisper 工作进程（每进程 {cpu_threads} 线程）")
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_size, compute_type, cpu_threads)
+            )
+            _pool_key = key
+            if _pool_listener is not None:
+                _pool_listener(1)
+        _pool_users += 1
+        pool = _pool
+
+    try:
+        yield pool
+    finally:
+        with _pool_cond:
+            # 进程池已被替换时，计数属于新进程池，不再扣减
+            if _pool is pool:
+                _pool_users -= 1
+                _pool_idle_since = time.time()
+                if _is_broken(pool):
+                    _close_pool()
+            _pool_cond.notify_all()
+
+
+def _is_broken(pool):
+    """进程池是否因工作进程异常退出而不可用"""
+    return pool is not None and bool(getattr(pool, "_broken", False))
+
+
+def _close_pool():
+    """关闭当前进程池（调用方需持有 _pool_cond）"""
+    global _pool, _pool_key, _pool_users
+
+    if _pool is None:
+        return
+    _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _pool_key = None
+    _pool_users = 0
+    if _pool_listener is not None:
+        _pool_listener(0)
+
+
+def unload_idle(idle_seconds):
+    """
+    关闭空闲超时的进程池（由服务器后台线程定期调用）
+
+    Args:
+        idle_seconds: 最后一个任务结束后保留进程池的秒数
+
+    Returns:
+        是否关闭了进程池
+    """
+    with _pool_cond:
+        if _pool is None or _pool_users or time.time() - _pool_idle_since < idle_seconds:
+            return False
+        print(f"[PARALLEL] 进程池空闲超过 {idle_seconds} 秒，关闭工作进程")
+        _close_pool()
+        return True
+
+
+def shutdown_pools():
+    """关闭常驻进程池"""
+    with _pool_cond:
+        _close_pool()
+        _pool_cond.notify_all()
+
+
+def find_split_points(audio, parts):
+    """
+    在静音处寻找切分点
+
+    优先使用 VAD 检测到的语音间隙（取间隙中点），
+    在每个理想切分位置附近选择离理想位置最近的间隙；找不到间隙时退回理想位置。
+
+    Args:
+        audio: 16 kHz 单声道 float32 音频
+        parts: 目标段数
+
+    Returns:
+        切分点（采样点下标）列表，长度为 parts - 1
+    """
+    from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+    total = len(audio)
+    speech = get_speech_timestamps(audio, VadOptions(min_silence_duration_ms=300))
+    gaps = [
+        (speech[i]["end"] + speech[i + 1]["start"]) // 2
+        for i in range(len(speech) - 1)
+    ]
+
+    points = []
+    window = int(total / parts * SPLIT_SEARCH_RATIO)
+    for i in range(1, parts):
+        ideal = total * i // parts
+        candidates = [g for g in gaps if abs(g - ideal) <= window and (not points or g > points[-1])]
+        point = min(candidates, key=lambda g: abs(g - ideal)) if candidates else ideal
+        if not points or point > points[-1]:
+            points.append(point)
+    return points
+
+
+def _normalize(text):
+    """去除标点与空白后比较文本"""
+    return re.sub(r"[\W_]+", "", text.lower())
+
+
+def stitch_segments(slices):
+    """
+    按顺序拼接各段结果，去除切分边界处的重复分段
+
+    Args:
+        slices: 每段的分段列表（时间已校正）
+
+    Returns:
+        拼接后的分段列表
+    """
+    merged = []
+    for segments in slices:
+        for segment in segments:
+            if merged:
+                previous = merged[-1]
+                overlaps = segment["start"] < previous["end"]
+                same_text = _normalize(segment["text"]) and (
+                    _normalize(segment["text"]) in _normalize(previous["text"])
+                )
+                if overlaps and same_text:
+                    continue
+            merged.append(segment)
+    return merged
+
+
+def transcribe_parallel(audio, workers, model_size, compute_type, options,
+                        progress_callback=None):
+    """
+    多进程并行转录长音频
+
+    Args:
+        audio: 音频文件路径或文件对象，或已解码的 16 kHz float32 波形（如解码缓存的 memmap）
+        workers: 工作进程数（即切分段数）
+        model_size: 模型大小
+        compute_type: 计算类型
+        options: model.transcribe 的参数（language 为 None 时先检测语言）
+        progress_callback: 每完成一段调用一次，参数为进度（0-1）
+
+    Returns:
+        dict: segments, language, language_probability, duration, duration_after_vad
+
+    Raises:
+        PoolBusy: 进程池正被参数不同的任务占用
+    """
+    # 先占用进程池再解码：进程池被占用时立即失败，不浪费解码与切分
+    with lease_pool(model_size, compute_type, workers) as pool:
+        return _transcribe_on_pool(pool, audio, workers, options, progress_callback)
+
+
+def _transcribe_on_pool(pool, audio, workers, options, progress_callback):
+    """在已占用的进程池上切段并行转录（参数见 transcribe_parallel）"""
+    import numpy as np
+    from faster_whisper import decode_audio
+
+    if not isinstance(audio, np.ndarray):
+        audio = decode_audio(audio if hasattr(audio, "read") else str(audio), sampling_rate=SAMPLE_RATE)
+    duration = len(audio) / SAMPLE_RATE
+    bounds = [0] + find_split_points(audio, workers) + [len(audio)]
+
+    tmp_dir = tempfile.mkdtemp(prefix="quicktrans-parallel-")
+    try:
+        slice_paths = []
+        for i in range(len(bounds) - 1):
+            path = os.path.join(tmp_dir, f"slice-{i}.npy")
+            np.save(path, audio[bounds[i]:bounds[i + 1]])
+            slice_paths.append(path)
+        del audio
+
+        # 自动检测语言时先统一检测一次，避免各段检测结果不一致
+        options = dict(options)
+        language_probability = 1.0
+        if options.get("language") is None:
+            language, language_probability = pool.submit(_detect_language, slice_paths[0]).result()
+            options["language"] = language
+
+        futures = {
+            pool.submit(_transcribe_slice, path, bounds[i] / SAMPLE_RATE, options): i
+            for i, path in enumerate(slice_paths)
+        }
+        results = [None] * len(slice_paths)
+        try:
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress_callback is not None:
+                    progress_callback(done / len(futures))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        return {
+            "segments": stitch_segments([segments for segments, _ in results]),
+            "language": options["language"],
+            "language_probability": language_probability,
+            "duration": duration,
+            "duration_after_vad": sum(after_vad for _, after_vad in results),
+        }
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
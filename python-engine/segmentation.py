@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+文本分段模块 - 翻译前的句子/分句切分与按 token 预算打包
+长文本先按句切分（兼容中日韩与拉丁标点），再打包成不超过 token 预算的块，
+保证切分无损：所有块按顺序拼接后与原文完全一致
+"""
+
+import re
+from collections import deque
+
+# 句末标点：中日韩标点直接断句；拉丁标点要求后面是空白或结尾（避免切开 3.14、e.g.x）
+SENTENCE_BOUNDARY = re.compile(
+    r"(?:[。！？；…]+[”’」』）)\]]*|[.!?;]+[\"'”’)\]]*(?=\s|$))\s*"
+)
+
+# 分句标点：句子本身超出预算时，再按逗号、顿号、冒号切分
+CLAUSE_BOUNDARY = re.compile(
+    r"(?:[，、：]+|[,:](?=\s))\s*"
+)
+
+# 译文拼接时不需要空格分隔的目标语言
+NO_SPACE_LANGUAGES = {"zh", "ja"}
+
+
+def split_by_pattern(text, pattern):
+    """
+    按正则切分文本，分隔符保留在前一段末尾
+
+    Args:
+        text: 要切分的文本
+        pattern: 匹配分隔位置的正则
+
+    Returns:
+        片段列表，拼接后与原文一致
+    """
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+        if end > start:
+            pieces.append(text[start:end])
+            start = end
+    if start < len(text):
+        pieces.append(text[start:])
+    return pieces
+
+
+def split_sentences(text):
+    """
+    按句切分文本
+
+    Args:
+        text: 要切分的文本
+
+    Returns:
+        句子列表，拼接后与原文一致
+    """
+    return split_by_pattern(text, SENTENCE_BOUNDARY)
+
+
+def _split_oversized(piece, count_tokens, max_tokens):
+    """将超出预算的片段依次按分句、按字符切小"""
+    clauses = split_by_pattern(piece, CLAUSE_BOUNDARY)
+    if len(clauses) > 1:
+        return clauses
+
+    # 没有任何可用标点：按 token 密度估算字符数硬切，优先落在空白处
+    n_tokens = max(count_tokens(piece), 1)
+    width = max(1, len(piece) * max_tokens // n_tokens)
+    parts = []
+    start = 0
+    while start < len(piece):
+        end = min(len(piece), start + width)
+        if end < len(piece):
+            space = piece.rfind(" ", start + 1, end)
+            if space > start:
+                end = space + 1
+        parts.append(piece[start:end])
+        start = end
+    return parts
+
+
+def pack_segments(text, count_tokens, max_tokens):
+    """
+    将文本切分并打包成不超过 token 预算的块
+
+    Args:
+        text: 要切分的文本
+        count_tokens: 计算片段 token 数的函数
+        max_tokens: 每块最大 token 数
+
+    Returns:
+        块列表，按顺序拼接后与原文一致
+    """
+    chunks = []
+    current = ""
+    current_tokens = 0
+
+    pending = deque(split_sentences(text))
+    while pending:
+        piece = pending.popleft()
+        n_tokens = count_tokens(piece)
+
+        if n_tokens > max_tokens:
+            parts = _split_oversized(piece, count_tokens, max_tokens)
+            if len(parts) > 1:
+                pending.extendleft(reversed(parts))
+                continue
+            # 单个字符仍超预算时无法再切，原样成块
+
+        if current and current_tokens + n_tokens > max_tokens:
+            chunks.append(current)
+            current = ""
+            current_tokens = 0
+
+        current += piece
+        current_tokens += n_tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def join_translations(parts, target_lang):
+    """
+    拼接各块译文
+
+    Args:
+        parts: 按顺序排列的译文块
+        target_lang: 目标语言代码
+
+    Returns:
+        拼接后的译文
+    """
+    separator = "" if target_lang in NO_SPACE_LANGUAGES else " "
+    return separator.join(part.strip() for part in parts if part.strip())
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+单飞（single-flight）加载模块
+同一个键同时只执行一次加载，并发调用方等待这次加载完成并共享结果；
+加载失败时异常会传递给所有等待者，但不会被缓存，下次调用会重新加载
+"""
+
+import threading
+
+
+class _Call:
+    """一次进行中的加载"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """按键合并并发加载"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        执行加载（同一键的并发调用只执行一次 fn）
+
+        Args:
+            key: 加载键（如模型名称）
+            fn: 无参数的加载函数
+
+        Returns:
+            fn 的返回值
+
+        Raises:
+            fn 抛出的异常（所有等待者都会收到同一个异常）
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            # 先移除再通知：失败结果不会留给之后的调用方
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def in_flight(self, key):
+        """指定键是否正在加载"""
+        with self._lock:
+            return key in self._calls
+
+
+# 全局模型加载器（Whisper 与翻译模型共用）
+model_loads = SingleFlight()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+启动导入耗时测试
+使用 python -X importtime 测量 api_server 的导入耗时，
+超出预算或导入了重量级模块（torch / transformers / faster_whisper）时失败
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# 导入耗时预算（毫秒），可通过环境变量调整
+IMPORT_BUDGET_MS = float(os.environ.get("QUICKTRANS_IMPORT_BUDGET_MS", "1500"))
+
+# 启动时不允许导入的重量级模块（应在首次加载模型时才导入）
+HEAVY_MODULES = ["torch", "transformers", "faster_whisper", "ctranslate2"]
+
+ENGINE_DIR = Path(__file__).resolve().parent
+
+
+def measure_imports(module="api_server"):
+    """
+    在子进程中导入模块并解析 -X importtime 输出
+
+    Returns:
+        {模块名: 累计耗时（微秒）}
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ENGINE_DIR,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入 {module} 失败:\n{result.stderr[-2000:]}")
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        # 格式: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = int(cumulative)
+    return timings
+
+
+def test_import_time_budget():
+    """api_server 导入耗时不超过预算，且不导入重量级模块"""
+    timings = measure_imports("api_server")
+
+    heavy = [name for name in timings if name.split(".")[0] in HEAVY_MODULES]
+    assert not heavy, f"启动时导入了重量级模块: {sorted(set(n.split('.')[0] for n in heavy))}"
+
+    total_ms = timings["api_server"] / 1000
+    assert total_ms <= IMPORT_BUDGET_MS, (
+        f"api_server 导入耗时 {total_ms:.0f} ms，超出预算 {IMPORT_BUDGET_MS:.0f} ms"
+    )
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("启动导入耗时测试")
+    print("=" * 60)
+    print()
+
+    timings = measure_imports("api_server")
+    total_ms = timings["api_server"] / 1000
+
+    print("耗时最多的导入:")
+    top_level = {name: us for name, us in timings.items() if "." not in name.strip()}
+    for name, us in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    print()
+    print(f"api_server 总计: {total_ms:.1f} ms（预算 {IMPORT_BUDGET_MS:.0f} ms）")
+    print()
+
+    try:
+        test_import_time_budget()
+        print("✓ 测试通过")
+    except AssertionError as e:
+        print(f"✗ 测试失败: {e}")
+        sys.exit(1)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+实时转录回放测试
+以实时速度把 WAV 文件按帧发送到 /api/transcribe/live，模拟麦克风输入，
+统计每个最终分段从音频说完到收到确定文本之间的延迟
+
+用法（先启动 api_server.py）:
+    python test_live_transcription.py test_audio.wav
+    python test_live_transcription.py test_audio.wav --url ws://127.0.0.1:5000/api/transcribe/live --speed 2
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+import wave
+
+# 每帧发送的音频时长（秒），与浏览器 AudioWorklet 常见的帧长相近
+FRAME_SECONDS = 0.1
+
+
+async def replay(path, url, language, speed):
+    """回放 WAV 文件，返回 (最终分段列表, 每个分段的延迟列表, done 消息)"""
+    import websockets
+
+    with wave.open(path, "rb") as f:
+        if f.getsampwidth() != 2:
+            raise ValueError("只支持 16 位 PCM WAV")
+        channels = f.getnchannels()
+        rate = f.getframerate()
+        pcm = f.readframes(f.getnframes())
+    if channels > 1:
+        import numpy as np
+        pcm = np.frombuffer(pcm, dtype="<i2").reshape(-1, channels)[:, 0].tobytes()
+
+    frame_bytes = int(rate * FRAME_SECONDS) * 2
+    finals, lags = [], []
+    done = None
+
+    async with websockets.connect(f"{url}?language={language}&sample_rate={rate}&format=s16le") as ws:
+        ready = json.loads(await ws.recv())
+        if ready["type"] != "ready":
+            raise RuntimeError(ready.get("detail", ready))
+        start = time.time()
+
+        async def send():
+            for i, offset in enumerate(range(0, len(pcm), frame_bytes)):
+                # 按实时速度发送：第 i 帧在 start + i * 帧长 时刻发出
+                delay = start + i * FRAME_SECONDS / speed - time.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                await ws.send(pcm[offset:offset + frame_bytes])
+            await ws.send(json.dumps({"type": "stop"}))
+
+        sender = asyncio.create_task(send())
+        async for raw in ws:
+            message = json.loads(raw)
+            if message["type"] == "final":
+                # 延迟 = 收到确定文本的时刻 - 该分段音频在实时回放中说完的时刻
+                lags.append(time.time() - (start + message["end"] / speed))
+                finals.append(message)
+                print(f"  [final {message['start']:7.2f}-{message['end']:7.2f}] {message['text']}")
+            elif message["type"] == "done":
+                done = message
+                break
+            elif message["type"] == "error":
+                raise RuntimeError(message["detail"])
+        await sender
+
+    return finals, lags, done
+
+
+def main():
+    parser = argparse.ArgumentParser(description="实时转录回放测试")
+    parser.add_argument("audio", help="16 位 PCM WAV 文件")
+    parser.add_argument("--url", default="ws://127.0.0.1:5000/api/transcribe/live")
+    parser.add_argument("--language", default="auto")
+    parser.add_argument("--speed", type=float, default=1.0, help="回放速度倍数")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("实时转录回放测试")
+    print("=" * 60)
+    print()
+
+    try:
+        finals, lags, done = asyncio.run(replay(args.audio, args.url, args.language, args.speed))
+    except Exception as e:
+        print(f"✗ 测试失败: {e}")
+        sys.exit(1)
+
+    print()
+    if not finals:
+        print("✗ 没有收到任何最终分段")
+        sys.exit(1)
+
+    lags_sorted = sorted(lags)
+    p95 = lags_sorted[min(len(lags_sorted) - 1, int(len(lags_sorted) * 0.95))]
+    print(f"✓ 最终分段数: {len(finals)}")
+    print(f"  语言: {done['language'] if done else '未知'}")
+    print(f"  解码次数: {done['decodes'] if done else '未知'}")
+    print(f"  丢弃音频: {done['dropped_seconds'] if done else 0} 秒")
+    print(f"  确定延迟: 平均 {statistics.mean(lags):.2f}s  中位数 {statistics.median(lags):.2f}s"
+          f"  P95 {p95:.2f}s  最大 {lags_sorted[-1]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
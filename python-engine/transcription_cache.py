@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+转录结果缓存模块 - 按音频内容哈希寻址的持久化缓存
+键由（音频内容 SHA-256、模型参数、语言、任务类型）组成；
+文件的 (size, mtime, inode) 未变化时直接复用上次计算的哈希，避免重复读取整个文件
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """计算文件内容的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TranscriptionCache:
+    """转录结果缓存 - SQLite 存储，按磁盘预算 LRU 淘汰"""
+
+    def __init__(self, cache_dir, max_bytes=512 * 1024 * 1024):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            max_bytes: 缓存结果占用的最大字节数
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max(1, int(max_bytes))
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            str(self.cache_dir / "transcriptions.db"),
+            check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS file_hashes ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " inode INTEGER NOT NULL,"
+            " digest TEXT NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._db.commit()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hashes_computed = 0
+        self.hashes_reused = 0
+
+        # 清理上次运行遗留的、文件已不存在的哈希记录（如异常退出时未删除的上传临时文件）
+        with self._lock:
+            self._prune_file_hashes()
+            self._db.commit()
+
+    def file_digest(self, path):
+        """
+        返回音频文件的内容哈希
+
+        文件的 (size, mtime, inode) 与上次记录一致时直接复用哈希。
+
+        Args:
+            path: 音频文件路径
+
+        Returns:
+            十六进制 SHA-256
+        """
+        path = str(Path(path).resolve())
+        st = os.stat(path)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT size, mtime_ns, inode, digest FROM file_hashes WHERE path = ?",
+                (path,)
+            ).fetchone()
+        if row is not None and tuple(row[:3]) == (st.st_size, st.st_mtime_ns, st.st_ino):
+            with self._lock:
+                self.hashes_reused += 1
+            return row[3]
+
+        digest = hash_file(path)
+        self.remember_digest(path, digest, st)
+        return digest
+
+    def remember_digest(self, path, digest, st=None):
+        """
+        记录文件哈希（供已在其他地方算出哈希的调用方使用，如流式上传）
+
+        Args:
+            path: 文件路径
+            digest: 十六进制 SHA-256
+            st: os.stat 结果（可选）
+        """
+        path = str(Path(path).resolve())
+        st = st or os.stat(path)
+        with self._lock:
+            self.hashes_computed += 1
+            self._db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, inode, digest)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, st.st_ino, digest)
+            )
+            self._db.commit()
+
+    def forget_digest(self, path):
+        """删除文件的哈希记录（文件即将删除时调用，如上传临时文件）"""
+        path = str(Path(path).resolve())
+        with self._lock:
+            self._db.execute("DELETE FROM file_hashes WHERE path = ?", (path,))
+            self._db.commit()
+
+    def _prune_file_hashes(self):
+        """删除文件已不存在的哈希记录（调用方需持有锁）"""
+        stale = [
+            (path,) for (path,) in self._db.execute("SELECT path FROM file_hashes").fetchall()
+            if not os.path.exists(path)
+        ]
+        self._db.executemany("DELETE FROM file_hashes WHERE path = ?", stale)
+        return len(stale)
+
+    @staticmethod
+    def make_key(digest, params):
+        """
+        生成结果缓存键
+
+        Args:
+            digest: 音频内容哈希
+            params: 影响结果的参数（模型大小、计算类型、语言、任务等）
+
+        Returns:
+            十六进制摘要字符串
+        """
+        payload = json.dumps([digest, params], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """查询缓存结果（未命中时返回 None）"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, result):
+        """写入缓存结果，并按磁盘预算淘汰最久未使用的结果"""
+        value = json.dumps(result, ensure_ascii=False)
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time())
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_bytes:
+                for old_key, old_size in self._db.execute(
+                    "SELECT key, size FROM results ORDER BY last_used ASC"
+                ).fetchall():
+                    if total <= self.max_bytes or old_key == key:
+                        break
+                    self._db.execute("DELETE FROM results WHERE key = ?", (old_key,))
+                    total -= old_size
+                    self.evictions += 1
+                # 哈希表与结果表一起清理，不随处理过的文件数无限增长
+                self._prune_file_hashes()
+            self._db.commit()
+
+    def clear(self):
+        """清空缓存结果"""
+        with self._lock:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            entries, total = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            file_hashes = self._db.execute("SELECT COUNT(*) FROM file_hashes").fetchone()[0]
+            return {
+                "entries": entries,
+                "file_hashes": file_hashes,
+                "bytes": total,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hashes_computed": self.hashes_computed,
+                "hashes_reused": self.hashes_reused,
+                "cache_dir": str(self.cache_dir),
+            }
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+翻译缓存模块 - 有界 LRU 内存缓存，可选 SQLite 持久化
+键由（语言对、解码参数、规范化后的原文）组成，重复文本无需再次 beam search
+"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """规范化原文：Unicode NFC、合并空白、去除首尾空白"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def make_cache_key(lang_pair, decoding_params, text):
+    """
+    生成缓存键
+
+    Args:
+        lang_pair: 语言对（如 "zh-en"）
+        decoding_params: 影响译文的解码参数（dict）
+        text: 原文
+
+    Returns:
+        十六进制摘要字符串
+    """
+    payload = json.dumps(
+        [lang_pair, decoding_params, normalize_text(text)],
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    """翻译结果缓存 - 按条数与字节数双重限额的 LRU"""
+
+    # 持久化数据库的淘汰间隔（写入次数）
+    PRUNE_INTERVAL = 100
+
+    def __init__(self, max_entries=10000, max_bytes=64 * 1024 * 1024, db_path=None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大缓存条数
+            max_bytes: 缓存译文占用的最大字节数
+            db_path: SQLite 文件路径（可选，为空时仅使用内存）
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self.db_path = db_path
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_writes = 0
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if db_path:
+            self._open_db(db_path)
+
+    def _open_db(self, db_path):
+        """打开（或创建）持久化数据库"""
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        # 上限调低后重新启动时，立即按新的上限淘汰
+        self._prune_db()
+        self._db.commit()
+
+    def get(self, key):
+        """
+        查询缓存
+
+        Args:
+            key: make_cache_key 生成的缓存键
+
+        Returns:
+            译文，未命中时返回 None
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    self._db.execute(
+                        "UPDATE translations SET last_used = ? WHERE key = ?",
+                        (time.time(), key)
+                    )
+                    self._db.commit()
+                    self._store(key, row[0])
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        """
+        写入缓存
+
+        Args:
+            key: make_cache_key 生成的缓存键
+            value: 译文
+        """
+        with self._lock:
+            self._store(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (key, value, last_used) VALUES (?, ?, ?)",
+                    (key, value, time.time())
+                )
+                # 磁盘与内存使用同样的条数与字节数上限，每 PRUNE_INTERVAL 次写入按最近使用时间淘汰一次
+                self._db_writes += 1
+                if self._db_writes % self.PRUNE_INTERVAL == 0:
+                    self._prune_db()
+                self._db.commit()
+
+    def _prune_db(self):
+        """淘汰持久化数据库中超出条数或字节数上限的最久未使用译文（调用方需持有锁）"""
+        # 按最近使用时间从新到旧累计条数与译文的 UTF-8 字节数，超出任一上限的全部删除
+        self._db.execute(
+            "DELETE FROM translations WHERE key IN ("
+            " SELECT key FROM ("
+            "  SELECT key,"
+            "   ROW_NUMBER() OVER recent AS position,"
+            "   SUM(LENGTH(CAST(value AS BLOB))) OVER recent AS total_bytes"
+            "  FROM translations"
+            "  WINDOW recent AS (ORDER BY last_used DESC, key ROWS UNBOUNDED PRECEDING))"
+            " WHERE position > ? OR total_bytes > ?)",
+            (self.max_entries, self.max_bytes)
+        )
+
+    def _store(self, key, value):
+        """写入内存 LRU 并按限额淘汰（调用方需持有锁）"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old.encode("utf-8"))
+
+        self._entries[key] = value
+        self._bytes += len(value.encode("utf-8"))
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted.encode("utf-8"))
+            self.evictions += 1
+
+    def clear(self):
+        """清空缓存（包括持久化数据）"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def stats(self):
+        """返回缓存统计信息"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "persistent": self._db is not None,
+                "db_path": str(self.db_path) if self.db_path else None,
+            }
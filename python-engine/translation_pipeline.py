@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+转录-翻译流水线模块 - Whisper 解码的同时在独立线程中翻译已完成的分段
+生产者（转录线程）每解码出一段就放入队列，消费者线程把队列中已有的分段攒成一批翻译，
+端到端耗时接近 max(转录, 翻译) 而不是两者之和
+"""
+
+import queue
+import threading
+
+_CLOSE = object()
+
+
+class TranslationPipeline:
+    """分段翻译流水线（单个消费者线程）"""
+
+    def __init__(self, manager, target_lang, max_batch_size=16):
+        """
+        初始化流水线
+
+        Args:
+            manager: TranslationManager 实例
+            target_lang: 目标语言
+            max_batch_size: 每批最多翻译的分段数
+        """
+        self.manager = manager
+        self.target_lang = target_lang
+        self.max_batch_size = max(1, int(max_batch_size))
+
+        self.source_lang = None
+        self.translations = []
+        self.error = None
+        self.batches = 0
+
+        self._cancelled = False
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def feed(self, text, source_lang):
+        """
+        提交一个已解码的分段（按解码顺序调用）
+
+        Args:
+            text: 分段文本
+            source_lang: 分段的源语言（第一次调用时确定整条流水线的源语言）
+        """
+        if self._thread is None:
+            self.source_lang = source_lang
+            self._thread = threading.Thread(
+                target=self._consume,
+                name="translation-pipeline",
+                daemon=True
+            )
+            self._thread.start()
+        self.translations.append(None)
+        self._queue.put((len(self.translations) - 1, text))
+
+    def close(self):
+        """
+        等待所有分段翻译完成
+
+        Returns:
+            译文列表，顺序与 feed 的顺序一致
+
+        Raises:
+            翻译线程中的异常
+        """
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+            self._thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.translations
+
+    def cancel(self):
+        """放弃尚未翻译的分段并结束消费者线程（转录失败时调用）"""
+        self._cancelled = True
+        if self._thread is not None:
+            self._queue.put(_CLOSE)
+
+    def _consume(self):
+        """消费者线程：把队列中已到达的分段攒成一批翻译"""
+        closed = False
+        while not closed:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if _CLOSE in batch:
+                closed = True
+                batch = [item for item in batch if item is not _CLOSE]
+            if not batch or self.error is not None or self._cancelled:
+                continue
+
+            try:
+                outputs = self.manager.translate_batch(
+                    [text for _, text in batch],
+                    self.source_lang,
+                    self.target_lang
+                )
+                for (index, _), translated in zip(batch, outputs):
+                    self.translations[index] = translated
+                self.batches += 1
+            except Exception as e:
+                # 记录第一个错误，剩余分段不再翻译，由 close 抛出
+                self.error = e
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+翻译微批调度模块 - 合并并发请求为一次批量翻译
+同一语言对的请求在短时间窗口内（或攒满最大批大小时）合并，
+由第一个到达的请求线程执行一次批量翻译，再把结果分发给各自的调用方
+"""
+
+import contextlib
+import threading
+from concurrent.futures import Future
+
+
+class _Batch:
+    """一个正在收集请求的批次"""
+
+    def __init__(self):
+        self.items = []
+        self.full = threading.Event()
+
+
+class TranslationScheduler:
+    """跨请求的动态微批调度器"""
+
+    def __init__(self, manager, window_ms=10, max_batch_size=32, slot=None):
+        """
+        初始化调度器
+
+        Args:
+            manager: TranslationManager 实例
+            window_ms: 收集请求的时间窗口（毫秒，0 表示不合并）
+            max_batch_size: 每批最多合并的请求数
+            slot: 返回上下文管理器的函数，只包住实际执行翻译的调用（如占用交互通道名额）；
+                等待合并的请求不占用名额
+        """
+        self.manager = manager
+        self.slot = slot or contextlib.nullcontext
+        self.window = max(0, window_ms) / 1000
+        self.max_batch_size = max(1, int(max_batch_size))
+
+        self._lock = threading.Lock()
+        self._pending = {}
+
+        self.requests = 0
+        self.batches = 0
+
+    def translate(self, text, source_lang, target_lang):
+        """
+        翻译文本（与同一时间窗口内的其他请求合并执行）
+
+        Args:
+            text: 要翻译的文本
+            source_lang: 源语言
+            target_lang: 目标语言
+
+        Returns:
+            翻译后的文本
+        """
+        if self.window <= 0:
+            with self._lock:
+                self.requests += 1
+                self.batches += 1
+            with self.slot():
+                return self.manager.translate(text, source_lang, target_lang)
+
+        key = (source_lang, target_lang)
+        future = Future()
+
+        with self._lock:
+            self.requests += 1
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = _Batch()
+                self._pending[key] = batch
+            batch.items.append((text, future))
+            if len(batch.items) >= self.max_batch_size:
+                # 批次已满：关闭批次，后续请求开启新批次
+                del self._pending[key]
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+                self.batches += 1
+            self._run(key, batch.items)
+
+        return future.result()
+
+    def _run(self, key, items):
+        """
+        执行一批翻译并分发结果
+
+        批内按长度分桶由 OfflineTranslator 完成（按长度排序后切分子批），
+        因此长短文本混合时不会互相 padding。
+        """
+        source_lang, target_lang = key
+        try:
+            with self.slot():
+                results = self.manager.translate_batch(
+                    [text for text, _ in items],
+                    source_lang,
+                    target_lang
+                )
+        except BaseException as e:
+            for _, future in items:
+                future.set_exception(e)
+            return
+
+        for (_, future), result in zip(items, results):
+            future.set_result(result)
+
+    def stats(self):
+        """返回调度统计信息"""
+        with self._lock:
+            return {
+                "window_ms": self.window * 1000,
+                "max_batch_size": self.max_batch_size,
+                "requests": self.requests,
+                "batches": self.batches,
+                "avg_batch_size": self.requests / self.batches if self.batches else 0.0,
+            }
@@ -4,8 +4,219 @@
 使用本地模型进行多语言翻译，无需联网
 """
 
-from transformers import AutoModelForSeq2SeqLM, MarianTokenizer
-import torch
+import gc
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from segmentation import pack_segments, join_translations
+from single_flight import model_loads
+from model_status import model_status, LOADING, WARM, FAILED, COLD
+from translation_cache import make_cache_key
+
+# CTranslate2 转换后模型的缓存目录
+CT2_MODEL_DIR = Path(os.environ.get(
+    "QUICKTRANS_CT2_MODEL_DIR",
+    Path.home() / ".cache" / "quicktrans" / "ct2"
+))
+
+
+class TransformersBackend:
+    """翻译后端 - PyTorch transformers（float32）"""
+
+    name = "transformers"
+
+    def __init__(self, model_name, cpu_threads=0):
+        """
+        初始化后端
+
+        Args:
+            model_name: Hugging Face 模型名称
+            cpu_threads: PyTorch 计算线程数（0 表示默认；PyTorch 线程数是进程级设置）
+        """
+        self.model_name = model_name
+        self.cpu_threads = cpu_threads
+        self.tokenizer = None
+        self.model = None
+
+    def cache_tag(self):
+        """影响译文的后端参数（用于翻译缓存键）"""
+        return {"backend": self.name}
+
+    def load(self):
+        """加载 tokenizer 和模型"""
+        # torch / transformers 导入耗时数秒，延迟到首次加载时导入，保证 API 进程快速启动
+        import torch
+        from transformers import AutoModelForSeq2SeqLM, MarianTokenizer
+
+        if self.cpu_threads:
+            torch.set_num_threads(self.cpu_threads)
+        self.tokenizer = MarianTokenizer.from_pretrained(self.model_name)
+        self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+
+    def resident_bytes(self):
+        """模型权重常驻内存的字节数（参数 + buffer）"""
+        if self.model is None:
+            return 0
+        tensors = list(self.model.parameters()) + list(self.model.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+
+    def generate(self, texts, generation_config):
+        """
+        翻译一批文本
+
+        Args:
+            texts: 文本列表（整批 padding 对齐）
+            generation_config: OfflineTranslator.GENERATION_CONFIG
+
+        Returns:
+            译文列表
+        """
+        import torch
+
+        # 编码输入文本（padding 对齐到本批最长序列）
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True
+        )
+
+        # 生成翻译
+        with torch.no_grad():
+            outputs = self.model.generate(**inputs, **generation_config)
+
+        # 解码结果
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+
+class CTranslate2Backend:
+    """翻译后端 - CTranslate2（默认 int8 量化，CPU 吞吐量数倍于 PyTorch）"""
+
+    name = "ctranslate2"
+
+    def __init__(self, model_name, compute_type="int8", model_dir=None, cpu_threads=0):
+        """
+        初始化后端
+
+        Args:
+            model_name: Hugging Face 模型名称
+            compute_type: CTranslate2 计算类型（int8, int8_float32, float32 等）
+            model_dir: 转换后模型的缓存目录（可选，默认 CT2_MODEL_DIR）
+            cpu_threads: 每次翻译使用的线程数（0 表示由 CTranslate2 自动决定）
+        """
+        self.model_name = model_name
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.model_dir = Path(model_dir or CT2_MODEL_DIR)
+        self.tokenizer = None
+        self.model = None
+
+    def cache_tag(self):
+        """影响译文的后端参数（用于翻译缓存键）"""
+        return {"backend": self.name, "compute_type": self.compute_type}
+
+    def converted_path(self):
+        """转换后模型所在目录（每个模型、每种量化各一份）"""
+        return self.model_dir / f"{self.model_name.replace('/', '--')}-{self.compute_type}"
+
+    def convert(self):
+        """将 Hugging Face 模型转换为 CTranslate2 格式（已转换时直接返回）"""
+        import ctranslate2
+
+        output_dir = self.converted_path()
+        if (output_dir / "model.bin").exists():
+            return output_dir
+
+        print(f"正在转换翻译模型为 CTranslate2 格式: {self.model_name} ({self.compute_type})")
+        # 先转换到临时目录再改名，避免中断后留下不完整的模型
+        tmp_dir = output_dir.with_name(output_dir.name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.parent.mkdir(parents=True, exist_ok=True)
+        converter = ctranslate2.converters.TransformersConverter(self.model_name)
+        converter.convert(str(tmp_dir), quantization=self.compute_type)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        tmp_dir.rename(output_dir)
+        print(f"✓ 模型转换完成: {output_dir}")
+        return output_dir
+
+    def load(self):
+        """转换（首次）并加载模型"""
+        import ctranslate2
+        from transformers import MarianTokenizer
+
+        model_path = self.convert()
+        self.tokenizer = MarianTokenizer.from_pretrained(self.model_name)
+        self.model = ctranslate2.Translator(
+            str(model_path),
+            device="cpu",
+            compute_type=self.compute_type,
+            intra_threads=self.cpu_threads
+        )
+
+    def resident_bytes(self):
+        """模型权重常驻内存的字节数（按转换后模型文件大小估算）"""
+        if self.model is None:
+            return 0
+        return sum(f.stat().st_size for f in self.converted_path().iterdir() if f.is_file())
+
+    def generate(self, texts, generation_config):
+        """
+        翻译一批文本
+
+        Args:
+            texts: 文本列表
+            generation_config: OfflineTranslator.GENERATION_CONFIG
+
+        Returns:
+            译文列表
+        """
+        sources = [
+            self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(text))
+            for text in texts
+        ]
+        results = self.model.translate_batch(
+            sources,
+            max_batch_size=len(sources),
+            beam_size=generation_config["num_beams"],
+            max_decoding_length=generation_config["max_length"],
+            no_repeat_ngram_size=generation_config["no_repeat_ngram_size"]
+        )
+        return [
+            self.tokenizer.decode(
+                self.tokenizer.convert_tokens_to_ids(result.hypotheses[0]),
+                skip_special_tokens=True
+            )
+            for result in results
+        ]
+
+
+# 可选的翻译后端
+TRANSLATION_BACKENDS = {
+    TransformersBackend.name: TransformersBackend,
+    CTranslate2Backend.name: CTranslate2Backend,
+}
+
+
+def create_backend(backend, model_name, **options):
+    """
+    按名称创建翻译后端
+
+    Args:
+        backend: 后端名称（transformers 或 ctranslate2）
+        model_name: Hugging Face 模型名称
+        **options: 传给后端的额外参数（cpu_threads；ctranslate2 另支持 compute_type、model_dir）
+
+    Returns:
+        后端实例
+    """
+    if backend not in TRANSLATION_BACKENDS:
+        raise ValueError(f"不支持的翻译后端: {backend}")
+    return TRANSLATION_BACKENDS[backend](model_name, **options)
+
 
 class OfflineTranslator:
     """离线翻译器 - 使用 OPUS-MT 模型"""
@@ -26,45 +237,83 @@ class OfflineTranslator:
         "es-en": "Helsinki-NLP/opus-mt-es-en",  # 西班牙文 → 英文
     }
 
-    def __init__(self, source_lang="zh", target_lang="en"):
+    # 长文本切块的 token 预算（每块单独翻译，避免截断与超长编码）
+    MAX_CHUNK_TOKENS = 96
+
+    # 生成参数（单条与批量翻译共用）
+    GENERATION_CONFIG = {
+        "max_length": 256,  # 输入已按 MAX_CHUNK_TOKENS 切块，为译文留出余量
+        "num_beams": 4,
+        "no_repeat_ngram_size": 2,
+        "early_stopping": True,
+    }
+
+    # 默认批大小：每次 generate 最多处理的文本条数
+    DEFAULT_BATCH_SIZE = 16
+
+    def __init__(self, source_lang="zh", target_lang="en", batch_size=DEFAULT_BATCH_SIZE,
+                 backend="transformers", backend_options=None):
         """
         初始化翻译器
 
         Args:
             source_lang: 源语言代码 (zh, en, ja, ko, fr, de, es)
             target_lang: 目标语言代码 (zh, en, ja, ko, fr, de, es)
+            batch_size: 批量翻译时每次 generate 的最大文本条数
+            backend: 翻译后端名称（transformers 或 ctranslate2）
+            backend_options: 传给后端的额外参数（可选）
         """
         self.source_lang = source_lang
         self.target_lang = target_lang
+        self.batch_size = max(1, int(batch_size))
 
         # 构建模型名称
         lang_pair = f"{source_lang}-{target_lang}"
+        self.lang_pair = lang_pair
         if lang_pair in self.OPUS_MODELS:
             self.model_name = self.OPUS_MODELS[lang_pair]
         else:
             raise ValueError(f"不支持的语言对: {lang_pair}")
 
+        self.backend = create_backend(backend, self.model_name, **(backend_options or {}))
         self.tokenizer = None
         self.model = None
 
     def load_model(self):
-        """加载翻译模型（首次会自动下载）"""
+        """
+        加载翻译模型（首次会自动下载）
+
+        并发调用只会加载一次，其余调用方等待同一次加载的结果。
+        """
         if self.model is None:
-            print(f"正在加载翻译模型: {self.model_name}")
-            print(f"翻译方向: {self.source_lang} → {self.target_lang}")
-            print("提示：首次运行会下载模型文件（约 300 MB）")
-            print()
+            model_loads.do(f"translator:{id(self)}", self._load_model)
+
+    def _load_model(self):
+        """实际执行加载（由 load_model 通过单飞调用）"""
+        if self.model is not None:
+            return
+
+        status_name = f"translator:{self.lang_pair}"
+        model_status.set(status_name, LOADING)
+        print(f"正在加载翻译模型: {self.model_name}")
+        print(f"翻译方向: {self.source_lang} → {self.target_lang}")
+        print(f"翻译后端: {self.backend.name}")
+        print("提示：首次运行会下载模型文件（约 300 MB）")
+        print()
 
-            try:
-                # 加载 tokenizer 和模型
-                self.tokenizer = MarianTokenizer.from_pretrained(self.model_name)
-                self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
+        try:
+            # 加载 tokenizer 和模型
+            self.backend.load()
+            self.tokenizer = self.backend.tokenizer
+            self.model = self.backend.model
 
-                print(f"✓ 模型加载完成")
-                print()
-            except Exception as e:
-                print(f"✗ 模型加载失败: {e}")
-                raise
+            model_status.set(status_name, WARM)
+            print(f"✓ 模型加载完成")
+            print()
+        except Exception as e:
+            model_status.set(status_name, FAILED, error=str(e))
+            print(f"✗ 模型加载失败: {e}")
+            raise
 
     def translate(self, text, src_lang=None, tgt_lang=None):
         """
@@ -78,33 +327,110 @@ class OfflineTranslator:
         Returns:
             翻译后的文本
         """
+        return self.translate_batch([text])[0]
+
+    def translate_batch(self, texts, batch_size=None):
+        """
+        批量翻译文本
+
+        每条文本先按句切分并打包成不超过 MAX_CHUNK_TOKENS 的块，
+        所有块 padding 后按批送入 generate，再按原顺序拼接。
+
+        Args:
+            texts: 要翻译的文本列表
+            batch_size: 每批文本条数（可选，默认使用初始化时的设置）
+
+        Returns:
+            翻译结果列表，顺序与输入一致
+        """
+        if not texts:
+            return []
+
         if self.model is None:
             self.load_model()
 
-        # 编码输入文本
-        inputs = self.tokenizer(text, return_tensors="pt")
+        batch_size = max(1, int(batch_size or self.batch_size))
 
-        # 生成翻译
-        with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_length=128,  # 合理的长度限制
-                num_beams=4,
-                no_repeat_ngram_size=2,
-                early_stopping=True
-            )
+        # 每条文本切成若干块，所有块一起按批翻译
+        owners = []
+        chunks = []
+        for index, text in enumerate(texts):
+            for chunk in pack_segments(text, self.count_tokens, self.MAX_CHUNK_TOKENS):
+                if chunk.strip():
+                    owners.append(index)
+                    chunks.append(chunk.strip())
 
-        # 解码结果
-        result = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        return result
+        translated_chunks = self._generate_batch(chunks, batch_size)
+
+        # 按原顺序重新拼接每条文本的译文
+        parts = [[] for _ in texts]
+        for index, translated in zip(owners, translated_chunks):
+            parts[index].append(translated)
+
+        return [join_translations(p, self.target_lang) for p in parts]
+
+    def count_tokens(self, text):
+        """计算文本的 token 数（不含结束符）"""
+        return len(self.tokenizer.tokenize(text))
+
+    def _generate_batch(self, texts, batch_size):
+        """
+        将文本按批送入翻译后端
+
+        Args:
+            texts: 已切块的文本列表
+            batch_size: 每批文本条数
+
+        Returns:
+            翻译结果列表，顺序与输入一致
+        """
+        # 按长度排序后分批，减少同一批内的 padding 浪费
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results = [None] * len(texts)
+
+        for start in range(0, len(order), batch_size):
+            indices = order[start:start + batch_size]
+            batch = [texts[i] for i in indices]
+            decoded = self.backend.generate(batch, self.GENERATION_CONFIG)
+            for i, translated in zip(indices, decoded):
+                results[i] = translated
+
+        return results
 
 
 class TranslationManager:
-    """翻译管理器 - 管理 OPUS-MT 翻译器"""
+    """翻译管理器 - 管理 OPUS-MT 翻译器（按内存预算 LRU 淘汰）"""
+
+    def __init__(self, batch_size=OfflineTranslator.DEFAULT_BATCH_SIZE, cache=None,
+                 backend="transformers", backend_options=None,
+                 memory_budget_bytes=None, idle_timeout=None):
+        """
+        初始化翻译管理器
 
-    def __init__(self):
-        """初始化翻译管理器"""
-        self.translators = {}
+        Args:
+            batch_size: 批量翻译时每次 generate 的最大文本条数
+            cache: TranslationCache 实例（可选，为空时不缓存）
+            backend: 翻译后端名称（transformers 或 ctranslate2）
+            backend_options: 传给后端的额外参数（可选）
+            memory_budget_bytes: 已加载翻译模型的总内存预算（可选，为空时不限制）
+            idle_timeout: 翻译器空闲多少秒后卸载（可选，为空时不卸载）
+        """
+        if backend not in TRANSLATION_BACKENDS:
+            raise ValueError(f"不支持的翻译后端: {backend}")
+
+        # 按最近使用顺序排列，最久未使用的在最前面
+        self.translators = OrderedDict()
+        self.batch_size = batch_size
+        self.cache = cache
+        self.backend = backend
+        self.backend_options = backend_options or {}
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_timeout = idle_timeout
+
+        self.resident_bytes = {}
+        self.last_used = {}
+        self.evictions = 0
+        self._lock = threading.RLock()
 
     def get_translator(self, source_lang, target_lang):
         """
@@ -118,11 +444,106 @@ class TranslationManager:
             OfflineTranslator 实例
         """
         lang_pair = f"{source_lang}-{target_lang}"
-        if lang_pair not in self.translators:
-            print(f"创建翻译器: {source_lang} → {target_lang}")
-            self.translators[lang_pair] = OfflineTranslator(source_lang, target_lang)
+        with self._lock:
+            if lang_pair not in self.translators:
+                print(f"创建翻译器: {source_lang} → {target_lang}")
+                self.translators[lang_pair] = OfflineTranslator(
+                    source_lang,
+                    target_lang,
+                    batch_size=self.batch_size,
+                    backend=self.backend,
+                    backend_options=self.backend_options
+                )
+
+            self.translators.move_to_end(lang_pair)
+            self.last_used[lang_pair] = time.time()
+            return self.translators[lang_pair]
+
+    def ensure_loaded(self, translator):
+        """
+        确保翻译器模型已加载，并在加载后执行内存预算淘汰
+
+        Args:
+            translator: OfflineTranslator 实例
+        """
+        if translator.model is not None:
+            return
+
+        translator.load_model()
+        with self._lock:
+            self.resident_bytes[translator.lang_pair] = translator.backend.resident_bytes()
+            self.enforce_memory_budget(keep=translator.lang_pair)
+
+    def evict(self, lang_pair, reason="evicted"):
+        """
+        卸载指定语言对的翻译器
+
+        正在使用该翻译器的请求仍持有引用，会正常完成；之后模型内存随引用释放。
+
+        Args:
+            lang_pair: 语言对（如 "zh-en"）
+            reason: 日志中的卸载原因
+        """
+        with self._lock:
+            if self.translators.pop(lang_pair, None) is None:
+                return
+            freed = self.resident_bytes.pop(lang_pair, 0)
+            self.last_used.pop(lang_pair, None)
+            self.evictions += 1
+            model_status.set(f"translator:{lang_pair}", COLD)
+        gc.collect()
+        print(f"[TRANSLATOR] 卸载翻译器 {lang_pair}（{reason}，释放约 {freed / 1024 / 1024:.0f} MB）")
+
+    def enforce_memory_budget(self, keep=None):
+        """
+        超出内存预算时按 LRU 淘汰翻译器
 
-        return self.translators[lang_pair]
+        Args:
+            keep: 不参与淘汰的语言对（通常是刚加载的那个）
+        """
+        if not self.memory_budget_bytes:
+            return
+        with self._lock:
+            while sum(self.resident_bytes.values()) > self.memory_budget_bytes:
+                victims = [p for p in self.translators if p != keep and p in self.resident_bytes]
+                if not victims:
+                    break
+                self.evict(victims[0], reason="超出内存预算")
+
+    def unload_idle(self):
+        """卸载空闲时间超过 idle_timeout 的翻译器"""
+        if not self.idle_timeout:
+            return
+        now = time.time()
+        with self._lock:
+            idle = [p for p, t in self.last_used.items() if now - t > self.idle_timeout]
+        for lang_pair in idle:
+            self.evict(lang_pair, reason="空闲超时")
+
+    def stats(self):
+        """返回已加载翻译器与淘汰状态"""
+        now = time.time()
+        with self._lock:
+            translators = [
+                {
+                    "lang_pair": lang_pair,
+                    "loaded": translator.model is not None,
+                    "resident_mb": round(self.resident_bytes.get(lang_pair, 0) / 1024 / 1024, 1),
+                    "idle_seconds": round(now - self.last_used.get(lang_pair, now), 1),
+                }
+                for lang_pair, translator in self.translators.items()
+            ]
+            return {
+                "backend": self.backend,
+                "translators": translators,
+                "resident_mb": round(sum(self.resident_bytes.values()) / 1024 / 1024, 1),
+                "memory_budget_mb": (
+                    round(self.memory_budget_bytes / 1024 / 1024, 1)
+                    if self.memory_budget_bytes else None
+                ),
+                "idle_timeout": self.idle_timeout,
+                "evictions": self.evictions,
+            }
 
     def translate(self, text, source_lang, target_lang):
         """
@@ -136,8 +557,57 @@ class TranslationManager:
         Returns:
             翻译后的文本
         """
+        return self.translate_batch([text], source_lang, target_lang)[0]
+
+    def translate_batch(self, texts, source_lang, target_lang, batch_size=None):
+        """
+        批量翻译同一语言对的多条文本
+
+        Args:
+            texts: 要翻译的文本列表
+            source_lang: 源语言
+            target_lang: 目标语言
+            batch_size: 每批文本条数（可选）
+
+        Returns:
+            翻译结果列表，顺序与输入一致
+        """
         translator = self.get_translator(source_lang, target_lang)
-        return translator.translate(text)
+        if self.cache is None:
+            self.ensure_loaded(translator)
+            return translator.translate_batch(texts, batch_size=batch_size)
+
+        # 先查缓存，只翻译未命中的文本（相同文本只翻译一次）
+        decoding_params = {
+            "model": translator.model_name,
+            "backend": translator.backend.cache_tag(),
+            "generation": translator.GENERATION_CONFIG,
+            "max_chunk_tokens": translator.MAX_CHUNK_TOKENS,
+        }
+        keys = [make_cache_key(translator.lang_pair, decoding_params, t) for t in texts]
+
+        results = [None] * len(texts)
+        pending = {}
+        for index, key in enumerate(keys):
+            cached = self.cache.get(key) if key not in pending else None
+            if cached is not None:
+                results[index] = cached
+            else:
+                pending.setdefault(key, []).append(index)
+
+        if pending:
+            self.ensure_loaded(translator)
+            misses = list(pending.items())
+            outputs = translator.translate_batch(
+                [texts[indices[0]] for _, indices in misses],
+                batch_size=batch_size
+            )
+            for (key, indices), translated in zip(misses, outputs):
+                self.cache.put(key, translated)
+                for index in indices:
+                    results[index] = translated
+
+        return results
 
 
 # 便捷函数
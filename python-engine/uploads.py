@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+音频上传模块 - 流式接收上传的音频，边接收边计算内容哈希
+小文件保留在内存中直接解码，超过阈值的写入有总容量上限的临时目录；
+哈希在接收完成时即已算好，转录缓存无需再次读取文件即可命中
+"""
+
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+from pathlib import Path
+
+# 临时文件后缀（启动时清理上次异常退出遗留的文件）
+SPOOL_SUFFIX = ".upload"
+
+# multipart 中非文件字段的最大字节数
+MAX_FIELD_BYTES = 4096
+
+
+class UploadTooLarge(Exception):
+    """单个上传超过大小上限"""
+
+
+class UploadSpoolFull(Exception):
+    """临时目录已达到总容量上限"""
+
+
+class SpooledUpload:
+    """一次上传的内容（小文件在内存中，大文件在临时目录中）"""
+
+    def __init__(self, spool, filename=None):
+        self._spool = spool
+        self._sha256 = hashlib.sha256()
+        self._buffer = io.BytesIO()
+        self._file = None
+        self._reserved = 0
+        self._closed = False
+
+        self.filename = filename
+        self.path = None
+        self.size = 0
+        self.digest = None
+
+    @property
+    def in_memory(self):
+        """内容是否完全在内存中"""
+        return self.path is None
+
+    def write(self, data):
+        """
+        追加一块数据
+
+        Raises:
+            UploadTooLarge: 超过单个上传的大小上限
+            UploadSpoolFull: 临时目录容量不足
+        """
+        if not data:
+            return
+        self.size += len(data)
+        if self.size > self._spool.max_file_bytes:
+            raise UploadTooLarge(f"上传文件超过 {self._spool.max_file_bytes // (1024 * 1024)} MB")
+        self._sha256.update(data)
+
+        if self._file is None and self.size > self._spool.memory_threshold:
+            # 超过内存阈值：把已接收的内容转存到临时目录，之后直接追加写入文件
+            self._spool._reserve(self.size - len(data))
+            self._reserved = self.size - len(data)
+            fd, path = tempfile.mkstemp(suffix=SPOOL_SUFFIX, dir=self._spool.upload_dir)
+            self._file = os.fdopen(fd, "wb")
+            self.path = path
+            self._file.write(self._buffer.getbuffer())
+            self._buffer = None
+
+        if self._file is not None:
+            self._spool._reserve(len(data))
+            self._reserved += len(data)
+            self._file.write(data)
+        else:
+            self._buffer.write(data)
+
+    def finish(self):
+        """
+        接收完成
+
+        Returns:
+            内容的十六进制 SHA-256
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.digest = self._sha256.hexdigest()
+        return self.digest
+
+    def source(self):
+        """返回可供解码的音频来源（内存中的文件对象或临时文件路径）"""
+        if self.path is not None:
+            return self.path
+        return io.BytesIO(self._buffer.getbuffer())
+
+    def close(self):
+        """删除临时文件并释放占用的容量（可重复调用）"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        self._spool._release(self._reserved, finished=True)
+        self._reserved = 0
+        self._buffer = None
+
+
+class UploadSpool:
+    """上传临时区 - 限制单个上传大小与临时文件总容量"""
+
+    def __init__(self, upload_dir=None, max_bytes=4 * 1024 * 1024 * 1024,
+                 memory_threshold=16 * 1024 * 1024, max_file_bytes=2 * 1024 * 1024 * 1024):
+        """
+        初始化
+
+        Args:
+            upload_dir: 临时目录（默认系统临时目录下的 quicktrans-uploads）
+            max_bytes: 所有进行中的上传占用临时目录的总字节数上限
+            memory_threshold: 不超过该大小的上传只保存在内存中
+            max_file_bytes: 单个上传的字节数上限
+        """
+        self.upload_dir = Path(upload_dir or Path(tempfile.gettempdir()) / "quicktrans-uploads")
+        self.max_bytes = max(1, int(max_bytes))
+        self.memory_threshold = max(0, int(memory_threshold))
+        self.max_file_bytes = max(1, int(max_file_bytes))
+        self.upload_dir.mkdir(parents=True, exist_ok=True)
+        for stale in self.upload_dir.glob(f"*{SPOOL_SUFFIX}"):
+            try:
+                stale.unlink()
+            except OSError:
+                pass
+
+        self._lock = threading.Lock()
+        self._bytes_on_disk = 0
+        self.active = 0
+        self.uploads = 0
+        self.rejected = 0
+
+    def open(self, filename=None):
+        """开始一次上传"""
+        with self._lock:
+            self.active += 1
+            self.uploads += 1
+        return SpooledUpload(self, filename)
+
+    def _reserve(self, size):
+        with self._lock:
+            if self._bytes_on_disk + size > self.max_bytes:
+                self.rejected += 1
+                raise UploadSpoolFull("上传临时目录已满，请稍后重试")
+            self._bytes_on_disk += size
+
+    def _release(self, size, finished=False):
+        with self._lock:
+            self._bytes_on_disk -= size
+            if finished:
+                self.active -= 1
+
+    def stats(self):
+        """返回临时区统计信息"""
+        with self._lock:
+            return {
+                "active": self.active,
+                "bytes_on_disk": self._bytes_on_disk,
+                "max_bytes": self.max_bytes,
+                "memory_threshold": self.memory_threshold,
+                "max_file_bytes": self.max_file_bytes,
+                "uploads": self.uploads,
+                "rejected": self.rejected,
+                "upload_dir": str(self.upload_dir),
+            }
+
+
+class MultipartUploadParser:
+    """
+    流式解析 multipart/form-data 请求体
+
+    文件部分（带 filename 的部分）的数据直接写入 SpooledUpload，不在内存中累积；
+    其余字段作为短文本收集到 fields 中。
+    """
+
+    def __init__(self, content_type, spool):
+        """
+        Args:
+            content_type: 请求的 Content-Type（包含 boundary）
+            spool: UploadSpool 实例
+        """
+        try:
+            import python_multipart as multipart
+        except ImportError:
+            import multipart
+
+        match = re.search(r'boundary="?([^";]+)"?', content_type)
+        if match is None:
+            raise ValueError("multipart 请求缺少 boundary")
+
+        self.spool = spool
+        self.upload = None
+        self.fields = {}
+
+        self._header_field = b""
+        self._header_value = b""
+        self._disposition = ""
+        self._field_name = None
+        self._field_value = None
+        self._target = None
+
+        self._parser = multipart.MultipartParser(match.group(1), callbacks={
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+        })
+
+    def feed(self, chunk):
+        """写入一块请求体"""
+        self._parser.write(chunk)
+
+    def finish(self):
+        """
+        请求体接收完成
+
+        Returns:
+            SpooledUpload（请求中没有文件时为 None）
+        """
+        self._parser.finalize()
+        return self.upload
+
+    def _on_part_begin(self):
+        self._disposition = ""
+        self._target = None
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            self._disposition = self._header_value.decode("utf-8", "replace")
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        name = re.search(r'\bname="([^"]*)"', self._disposition)
+        filename = re.search(r'\bfilename="([^"]*)"', self._disposition)
+        if filename is not None and self.upload is None:
+            self.upload = self.spool.open(filename.group(1))
+            self._target = "file"
+        elif name is not None:
+            self._field_name = name.group(1)
+            self._field_value = bytearray()
+            self._target = "field"
+
+    def _on_part_data(self, data, start, end):
+        if self._target == "file":
+            self.upload.write(data[start:end])
+        elif self._target == "field":
+            self._field_value += data[start:end]
+            if len(self._field_value) > MAX_FIELD_BYTES:
+                raise ValueError(f"表单字段 {self._field_name} 过长")
+
+    def _on_part_end(self):
+        if self._target == "field":
+            self.fields[self._field_name] = self._field_value.decode("utf-8", "replace")
+        self._target = None
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Whisper 模型登记表 - 按（模型大小、计算类型、CPU 线程数）管理常驻模型
+同时常驻的模型变体数有上限（多进程转录进程池计为一个变体），超出时按 LRU 卸载最久未使用的模型
+"""
+
+import gc
+import threading
+import time
+from collections import OrderedDict
+
+from single_flight import model_loads
+from model_status import model_status, LOADING, WARM, FAILED, COLD
+
+# 可选的模型大小
+WHISPER_MODEL_SIZES = [
+    "tiny", "tiny.en", "base", "base.en", "small", "small.en",
+    "medium", "medium.en", "large-v1", "large-v2", "large-v3",
+]
+
+# CPU 上可用的计算类型（int8 / int8_float32 速度是 float32 的数倍，精度损失可忽略）
+WHISPER_COMPUTE_TYPES = ["int8", "int8_float32", "int16", "float32"]
+
+
+def status_name(key):
+    """模型在状态登记表中的名称"""
+    model_size, compute_type, cpu_threads = key
+    return f"whisper:{model_size}:{compute_type}:{cpu_threads}"
+
+
+class WhisperModelRegistry:
+    """Whisper 模型登记表"""
+
+    def __init__(self, max_resident=2, device="cpu"):
+        """
+        初始化登记表
+
+        Args:
+            max_resident: 同时常驻的模型变体数上限
+            device: 推理设备
+        """
+        self.max_resident = max(1, int(max_resident))
+        self.device = device
+
+        # 按最近使用顺序排列，最久未使用的在最前面
+        self._models = OrderedDict()
+        self._last_used = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+        # 本进程之外常驻的模型变体数（多进程转录进程池存活时为 1）
+        self.external = 0
+
+    def get(self, model_size, compute_type, cpu_threads=0):
+        """
+        获取模型（未加载时加载，并发加载同一变体只加载一次）
+
+        Args:
+            model_size: 模型大小（如 small）
+            compute_type: 计算类型（如 int8）
+            cpu_threads: CPU 线程数（0 表示由 CTranslate2 自动决定）
+
+        Returns:
+            WhisperModel 实例
+        """
+        key = (model_size, compute_type, int(cpu_threads or 0))
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._models.move_to_end(key)
+                self._last_used[key] = time.time()
+                return model
+
+        return model_loads.do(status_name(key), lambda: self._load(key))
+
+    def _load(self, key):
+        """实际执行加载（由 get 通过单飞调用）"""
+        with self._lock:
+            if key in self._models:
+                return self._models[key]
+
+        model_size, compute_type, cpu_threads = key
+        name = status_name(key)
+        model_status.set(name, LOADING)
+        print(f"正在加载 Whisper 模型: {model_size} ({compute_type}, cpu_threads={cpu_threads})")
+        try:
+            # faster_whisper 导入耗时较长，延迟到首次加载模型时导入
+            from faster_whisper import WhisperModel
+
+            model = WhisperModel(
+                model_size,
+                device=self.device,
+                compute_type=compute_type,
+                cpu_threads=cpu_threads
+            )
+        except Exception as e:
+            model_status.set(name, FAILED, error=str(e))
+            raise
+
+        with self._lock:
+            self._models[key] = model
+            self._last_used[key] = time.time()
+            # 刚加载的模型总是保留
+            victims = self._evict(keep=1)
+
+        if victims:
+            gc.collect()
+        model_status.set(name, WARM)
+        print("✓ Whisper 模型加载完成")
+        return model
+
+    def set_external(self, count):
+        """
+        设置本进程之外常驻的模型变体数，并卸载超出上限的本进程模型
+
+        Args:
+            count: 常驻的多进程转录进程池数（0 表示进程池已关闭）
+        """
+        with self._lock:
+            self.external = max(0, int(count))
+            victims = self._evict(keep=0)
+        if victims:
+            gc.collect()
+
+    def _evict(self, keep):
+        """按 LRU 卸载超出上限的模型，至少保留最近使用的 keep 个（调用方需持有锁）"""
+        excess = len(self._models) + self.external - self.max_resident
+        victims = list(self._models)[:max(0, min(excess, len(self._models) - keep))]
+        for victim in victims:
+            del self._models[victim]
+            self._last_used.pop(victim, None)
+            self.evictions += 1
+            model_status.set(status_name(victim), COLD)
+            print(f"[WHISPER] 卸载 Whisper 模型 {status_name(victim)}（超出常驻上限）")
+        return victims
+
+    def stats(self):
+        """返回常驻模型与淘汰状态"""
+        now = time.time()
+        with self._lock:
+            return {
+                "max_resident": self.max_resident,
+                "external": self.external,
+                "evictions": self.evictions,
+                "models": [
+                    {
+                        "model_size": key[0],
+                        "compute_type": key[1],
+                        "cpu_threads": key[2],
+                        "idle_seconds": round(now - self._last_used.get(key, now), 1),
+                    }
+                    for key in self._models
+                ],
+            }